@@ -1,16 +1,109 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import folium_static
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from types import MappingProxyType
+import atexit
+import copy
+import hashlib
+import html
+import importlib
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl
 import warnings
+
+from projections import INDICATEURS, Hypotheses, simulate_batch
 warnings.filterwarnings('ignore')
 
+# Copy-on-write : les vues dérivées des DataFrames partagés ne les modifient jamais
+pd.options.mode.copy_on_write = True
+
+class LazyModule:
+    """Module importé au premier accès à l'un de ses attributs
+    
+    Les bibliothèques de graphiques et de cartes ne sont chargées qu'au premier
+    rendu qui les utilise : l'en-tête et les KPI s'affichent sans les attendre.
+    """
+    
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+    
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+folium = LazyModule('folium')
+folium_plugins = LazyModule('folium.plugins')
+components = LazyModule('streamlit.components.v1')
+
+# Graine du jeu de données simulé : la changer invalide le cache partagé
+DATA_SEED = 42
+
+# Source des données : 'synthetic' (simulation) ou 'csv:', 'parquet:', 'sqlite:', 'duckdb:' suivi d'un chemin,
+# ou 'shared:' suivi du répertoire écrit par loader.py (mode multi-workers)
+DATA_SOURCE_URI = os.environ.get('BAILLEURS_DATA_SOURCE', 'synthetic')
+
+# Répertoire des instantanés sur disque du jeu de données préparé (tables et agrégats) :
+# un démarrage à froid les projette en mémoire au lieu de tout reconstruire
+SNAPSHOT_DIR = os.environ.get('BAILLEURS_SNAPSHOT_DIR')
+# Version du format des instantanés, à incrémenter quand leur contenu change
+SNAPSHOT_FORMAT = 1
+
+# Intervalle (en secondes) de surveillance de la source par le rafraîchissement automatique
+REFRESH_INTERVAL = int(os.environ.get('BAILLEURS_REFRESH_INTERVAL', '60'))
+
+# Instrumentation : journal JSONL des mesures de chaque exécution et fichier de
+# métriques au format texte Prometheus (collecteur textfile), désactivés par défaut
+METRICS_LOG = os.environ.get('BAILLEURS_METRICS_LOG')
+METRICS_PROM = os.environ.get('BAILLEURS_METRICS_PROM')
+# Intervalle (en secondes) d'écriture de ces fichiers, hors du rendu des pages
+METRICS_FLUSH_INTERVAL = 10
+
+# Sections du dashboard et méthode de rendu associée
+SECTIONS = {
+    "📈 Vue d'ensemble": 'create_bailleurs_overview',
+    "🏢 Bailleurs": 'create_bailleurs_analysis',
+    "🏠 Parc Social": 'create_parc_analysis',
+    "🏗️ Projets": 'create_projets_analysis',
+    "📈 Demande": 'create_demande_analysis',
+    "🎯 Stratégie": 'create_strategic_analysis',
+    "ℹ️ À Propos": 'create_about_section'
+}
+
+# Tables filtrées proposées au téléchargement sous chaque section
+SECTION_EXPORTS = {
+    'create_bailleurs_analysis': ('historique', 'parc'),
+    'create_parc_analysis': ('parc',),
+    'create_projets_analysis': ('projets',)
+}
+# Lignes converties puis écrites à la fois lors d'un téléchargement
+EXPORT_CHUNK_ROWS = 65536
+
+# DataFrames construits une seule fois par processus et partagés entre sessions
+DATASET_FRAMES = ('parc_data', 'historical_data', 'projets_data', 'demande_data', 'financement_data')
+# Table de la source correspondant à chacun de ces DataFrames
+DATASET_FRAMES_TABLES = (('parc_data', 'parc'), ('historical_data', 'historique'), ('projets_data', 'projets'),
+                         ('demande_data', 'demande'), ('financement_data', 'financement'))
+
 # Configuration de la page
 st.set_page_config(
     page_title="Dashboard Bailleurs Sociaux - Île de la Réunion",
@@ -19,8 +112,8 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# CSS personnalisé
-st.markdown("""
+# CSS personnalisé, repris par les rapports exportés (export.py)
+DASHBOARD_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -55,6 +148,10 @@ st.markdown("""
     .performance-medium { background-color: #fff3cd; border-left: 4px solid #ffc107; }
     .performance-low { background-color: #f8d7da; border-left: 4px solid #dc3545; }
     .performance-excellent { background-color: #d1ecf1; border-left: 4px solid #17a2b8; }
+    .bailleurs-table { width: 100%; border-collapse: collapse; }
+    .bailleurs-table th { text-align: left; border-bottom: 2px solid #FF9800; }
+    .bailleurs-table td { vertical-align: top; padding: 0.5rem; border-bottom: 1px solid #e0e0e0; }
+    .bailleurs-table td div { padding: 0.25rem 0.5rem; }
     .microregion-badge {
         display: inline-block;
         padding: 0.25rem 0.5rem;
@@ -85,17 +182,651 @@ st.markdown("""
     .accession { background-color: #FF9800; }
     .renovation { background-color: #9C27B0; }
 </style>
-""", unsafe_allow_html=True)
+"""
+@st.cache_resource
+def dashboard_style():
+    """Feuille de style du dashboard minifiée, calculée une fois par processus"""
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', ' '.join(DASHBOARD_CSS.split()))
 
-class BailleursSociauxDashboard:
+# Streamlit retire de la page les éléments qui ne sont pas renvoyés à chaque exécution :
+# le style est donc renvoyé à chaque exécution, par st.html, hors de la mise en page
+if hasattr(st, 'html'):
+    st.html(dashboard_style())
+else:
+    st.markdown(dashboard_style(), unsafe_allow_html=True)
+
+class FigureCache:
+    """Cache LRU des figures plotly, borné en nombre d'entrées et en mémoire
+    
+    Les figures sont conservées construites, avec la taille de leur JSON mesurée
+    une fois à la construction. Le JSON lui-même n'est pas conservé : st.plotly_chart
+    resérialise toujours la figure (plotly.io.to_json) et n'accepte pas de charge
+    déjà sérialisée. Un succès évite donc la construction et la réduction des
+    traces, pas la sérialisation de l'envoi.
+    """
+    
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key, build):
+        """Retourne la figure associée à la clé, construite par build() en cas d'absence"""
+        return self.lookup(key, build)[0]
+    
+    def lookup(self, key, build):
+        """Valeur associée à la clé et taille conservée dans le cache (octets), construite en cas d'absence"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            # Décompression éventuelle hors verrou
+            return self.decode(entry[0]), entry[1]
+        
+        # Construction hors verrou : les autres sessions ne sont pas bloquées
+        fig = build()
+        stored, size = self.encode(fig)
+        
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (stored, size)
+            self.total_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+        return fig, size
+    
+    def encode(self, fig):
+        """Valeur conservée dans le cache et sa taille en octets (JSON envoyé pour une figure)"""
+        return fig, len(fig.to_json())
+    
+    def stats(self):
+        """Compteurs d'utilisation du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def decode(self, stored):
+        """Valeur restituée à partir de celle conservée dans le cache"""
+        return stored
+    
+    def discard(self, predicate):
+        """Retire les entrées dont la clé vérifie le prédicat ; retourne leur nombre"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                self.total_bytes -= self._entries.pop(key)[1]
+        return len(keys)
+
+class MapCache(FigureCache):
+    """Cache LRU du HTML des cartes folium, compressé en mémoire
+    
+    Une carte déjà rendue est servie telle quelle : ni construction folium, ni
+    sérialisation. Le HTML, très répétitif, se compresse d'un facteur 5 à 10.
+    """
+    
+    def __init__(self, max_entries=64, max_bytes=32 * 1024 * 1024):
+        super().__init__(max_entries, max_bytes)
+    
+    def encode(self, page):
+        stored = zlib.compress(page.encode('utf-8'), 6)
+        return stored, len(stored)
+    
+    def decode(self, stored):
+        return zlib.decompress(stored).decode('utf-8')
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache de figures partagé par toutes les sessions du processus"""
+    return FigureCache()
+
+@st.cache_resource
+def get_map_cache():
+    """Cache des cartes rendues, partagé par toutes les sessions du processus"""
+    return MapCache()
+
+def lttb_indices(x, y, budget):
+    """Positions des points conservés par l'algorithme Largest-Triangle-Three-Buckets
+    
+    Le premier et le dernier point sont conservés ; dans chaque intervalle
+    intermédiaire, on garde le point qui forme le plus grand triangle avec le point
+    retenu précédemment et la moyenne de l'intervalle suivant.
+    """
+    n = len(x)
+    if n <= budget or budget < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, budget - 1).astype('int64')
+    selected = np.empty(budget, dtype='int64')
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[next_start:next_end].mean(), np.nanmean(y[next_start:next_end])
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+    return selected
+
+def box_figure(frame, x, y, title, color=False):
+    """Boîtes à moustaches calculées côté serveur : quartiles et moustaches au lieu des points bruts
+    
+    Les quartiles suivent la méthode linéaire de plotly et les moustaches s'arrêtent
+    aux valeurs extrêmes comprises dans 1,5 écart interquartile ; les valeurs
+    au-delà ne sont pas tracées. Avec `color`, chaque catégorie a sa propre trace et
+    sa couleur, comme px.box(color=x).
+    """
+    data = frame[[x, y]].dropna()
+    groups = data.groupby(x, observed=True)[y]
+    stats = groups.quantile([0.25, 0.5, 0.75]).unstack().reindex(columns=[0.25, 0.5, 0.75])
+    stats.columns = ['q1', 'median', 'q3']
+    iqr = stats['q3'] - stats['q1']
+    bounds = pd.DataFrame({'low': stats['q1'] - 1.5 * iqr, 'high': stats['q3'] + 1.5 * iqr})
+    values = data[y].to_numpy()
+    low = bounds['low'].reindex(data[x]).to_numpy()
+    high = bounds['high'].reindex(data[x]).to_numpy()
+    stats['lowerfence'] = pd.Series(np.where(values >= low, values, np.inf)).groupby(data[x].to_numpy()).min()
+    stats['upperfence'] = pd.Series(np.where(values <= high, values, -np.inf)).groupby(data[x].to_numpy()).max()
+    stats['mean'] = groups.mean()
+    
+    def trace(rows, **kwargs):
+        return go.Box(x=[str(c) for c in rows.index], q1=rows['q1'], median=rows['median'], q3=rows['q3'],
+                      lowerfence=rows['lowerfence'], upperfence=rows['upperfence'], mean=rows['mean'],
+                      boxpoints=False, **kwargs)
+    
+    if color:
+        palette = px.colors.qualitative.Plotly
+        traces = [trace(stats.iloc[[i]], name=str(category), marker_color=palette[i % len(palette)])
+                  for i, category in enumerate(stats.index)]
+    else:
+        traces = [trace(stats, name='', showlegend=False)]
+    fig = go.Figure(traces)
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, legend_title_text=x if color else None)
+    return fig
+
+def compact_figure(fig):
+    """Réduit ce qu'une figure envoie au navigateur, trace par trace
+    
+    Les lignes au-delà de CHART_POINT_BUDGET points sont réduites par LTTB, les
+    nuages de points au-delà de SCATTERGL_THRESHOLD passent en Scattergl, et les
+    grands tableaux sont encodés en binaire : dates en millisecondes et flottants
+    en simple précision.
+    """
+    webgl = False
+    for trace in fig.data:
+        if trace.type not in ('scatter', 'scattergl') or not isinstance(trace.x, np.ndarray) \
+                or not isinstance(trace.y, np.ndarray):
+            continue
+        x, y = trace.x, trace.y
+        dates = np.issubdtype(x.dtype, np.datetime64)
+        numeric_x = x.astype('datetime64[ms]').astype('float64') if dates else x
+        
+        lines = 'lines' in (trace.mode or 'lines')
+        if lines and len(x) > CHART_POINT_BUDGET and np.issubdtype(numeric_x.dtype, np.number) \
+                and np.issubdtype(y.dtype, np.number) and (np.diff(numeric_x) >= 0).all():
+            keep = lttb_indices(numeric_x.astype('float64'), y.astype('float64'), CHART_POINT_BUDGET)
+            x, y, numeric_x = x[keep], y[keep], numeric_x[keep]
+            for attr in ('customdata', 'text', 'hovertext'):
+                values = getattr(trace, attr)
+                if isinstance(values, np.ndarray) and len(values) == len(trace.x):
+                    trace[attr] = values[keep]
+        
+        if len(x) >= CHART_COMPACT_MIN:
+            if dates:
+                x = numeric_x
+                fig.layout[trace.xaxis.replace('x', 'xaxis', 1)].type = 'date'
+            x = x.astype('float32') if x.dtype == np.float64 and not dates else x
+            y = y.astype('float32') if y.dtype == np.float64 else y
+        trace.x, trace.y = x, y
+        webgl |= trace.type == 'scatter' and not lines and len(x) > SCATTERGL_THRESHOLD
+    
+    if webgl:
+        traces = [go.Scattergl(trace.to_plotly_json() | {'type': 'scattergl'})
+                  if trace.type == 'scatter' and 'lines' not in (trace.mode or 'lines')
+                  and len(trace.x) > SCATTERGL_THRESHOLD else trace
+                  for trace in fig.data]
+        fig = go.Figure(traces, layout=fig.layout)
+    return fig
+
+def figure_points(fig):
+    """Nombre de points de données des traces d'une figure plotly"""
+    total = 0
+    for trace in fig.data:
+        for attr in ('x', 'values', 'y', 'lat'):
+            values = getattr(trace, attr, None)
+            if values is not None:
+                total += len(values)
+                break
+    return total
+
+class RunProfile:
+    """Mesures d'une exécution de la page : durée, lignes et taille envoyée par élément
+    
+    Chaque mesure est un enregistrement (type, nom, secondes, lignes, octets) ; les
+    sections englobent les figures et cartes qu'elles construisent et envoient.
+    """
+    
     def __init__(self):
-        self.bailleurs_data = self.define_bailleurs_data()
-        self.parc_data = self.initialize_parc_data()
-        self.historical_data = self.initialize_historical_data()
-        self.projets_data = self.initialize_projets_data()
-        self.demande_data = self.initialize_demande_data()
-        self.financement_data = self.initialize_financement_data()
+        self.records = []
+        self.names = {}
+        # Taille JSON des figures servies par le cache, mesurée une fois à leur construction
+        self.sizes = {}
+        self.started = time.perf_counter()
+    
+    @contextmanager
+    def timed(self, kind, name, rows=None, payload=None):
+        """Mesure la durée du bloc ; lignes et octets peuvent être renseignés dans l'enregistrement"""
+        record = {'kind': kind, 'name': name, 'seconds': 0.0, 'rows': rows, 'bytes': payload}
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = time.perf_counter() - start
+            self.records.append(record)
+    
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+class MetricsRegistry:
+    """Cumul des mesures de toutes les sessions du processus
+    
+    Chaque exécution est ajoutée au journal JSONL et les cumuls par élément sont
+    réécrits au format texte Prometheus, pour un collecteur de type textfile. Une
+    exécution ne fait que cumuler ses mesures en mémoire : les fichiers sont écrits
+    périodiquement par un thread dédié (et à l'arrêt du processus), jamais pendant
+    le rendu d'une page.
+    """
+    
+    def __init__(self, log_path=METRICS_LOG, prom_path=METRICS_PROM, interval=METRICS_FLUSH_INTERVAL):
+        self.log_path = log_path
+        self.prom_path = prom_path
+        self.interval = interval
+        self.totals = {}
+        self._pending = []
+        self._changed = False
+        self._thread = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def record(self, profile, section):
+        """Cumule les mesures d'une exécution de la page ; elles seront écrites au prochain flush()"""
+        entry = {'time': datetime.now().isoformat(timespec='milliseconds'), 'section': section,
+                 'seconds': profile.elapsed(), 'records': profile.records}
+        with self._lock:
+            for record in profile.records:
+                total = self.totals.setdefault((record['kind'], record['name']), [0, 0.0, 0, 0])
+                total[0] += 1
+                total[1] += record['seconds']
+                total[2] += record['rows'] or 0
+                total[3] += record['bytes'] or 0
+            if self.log_path:
+                self._pending.append(entry)
+            self._changed = True
+        self.start()
+    
+    def start(self):
+        """Démarre le thread d'écriture s'il n'est pas déjà en cours"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, name='bailleurs-metrics', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+    
+    def stop(self):
+        self._stop.set()
+    
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+    
+    def flush(self):
+        """Écrit les entrées en attente du journal et les cumuls au format Prometheus"""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                prometheus = self.prometheus() if self.prom_path and self._changed else None
+                self._changed = False
+            if pending:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in pending)
+            if prometheus is not None:
+                with open(f"{self.prom_path}.tmp", 'w', encoding='utf-8') as f:
+                    f.write(prometheus)
+                os.replace(f"{self.prom_path}.tmp", self.prom_path)
+    
+    def prometheus(self):
+        """Cumuls au format d'exposition texte de Prometheus"""
+        def label(value):
+            return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
         
+        metrics = (
+            ('bailleurs_render_total', 'Nombre de mesures par élément', 0),
+            ('bailleurs_render_seconds_total', 'Durée cumulée par élément (secondes)', 1),
+            ('bailleurs_render_rows_total', 'Lignes ou points de données traités par élément', 2),
+            ('bailleurs_render_bytes_total', 'Octets envoyés au navigateur par élément', 3)
+        )
+        lines = []
+        for metric, description, position in metrics:
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+            for (kind, name), total in sorted(self.totals.items()):
+                lines.append(f'{metric}{{kind="{label(kind)}",name="{label(name)}"}} {total[position]}')
+        return '\n'.join(lines) + '\n'
+
+@st.cache_resource
+def get_metrics_registry():
+    """Cumul des mesures partagé par toutes les sessions du processus"""
+    return MetricsRegistry()
+
+# Référentiels partagés par le générateur et les contrôles
+TYPES_LOGEMENT = ['PLAI', 'PLUS', 'PLS', 'Intermediaire', 'Accession', 'Etudiant', 'Senior']
+MICROREGIONS = ['Nord', 'Sud', 'Ouest', 'Est']
+TYPES_PROJET = ['Neuf', 'Rénovation', 'Réhabilitation', 'ANRU', 'Démolition-Reconstruction']
+STATUTS_PROJET = ['En étude', 'En travaux', 'En livraison', 'Terminé']
+COMMUNES_REUNION = [
+    'Saint-Denis', 'Saint-Paul', 'Saint-Pierre', 'Le Tampon', 'Saint-Louis',
+    'Saint-André', 'Saint-Benoît', 'Saint-Joseph', 'Sainte-Marie', 'Le Port',
+    'La Possession', 'Sainte-Suzanne', 'Saint-Leu', 'Petite-Île', "L'Étang-Salé",
+    'Bras-Panon', 'Entre-Deux', 'Les Avirons', 'Trois-Bassins', 'Sainte-Rose',
+    'Saint-Philippe', 'La Plaine-des-Palmistes', 'Cilaos', 'Salazie'
+]
+
+def stable_digest(*key):
+    """Empreinte 64 bits d'une clé, stable entre processus (contrairement à hash())"""
+    data = '\x1f'.join(map(str, key)).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def entity_rng(seed, *key):
+    """Générateur aléatoire dérivé de la graine maître et de la clé d'une entité"""
+    return np.random.default_rng([seed, stable_digest(*key)])
+
+# Coordonnées approximatives des micro-régions
+MICROREGION_COORDS = {
+    'Nord': (-20.8789, 55.4481),
+    'Sud': (-21.3393, 55.4781),
+    'Ouest': (-21.0097, 55.2697),
+    'Est': (-21.0339, 55.7147)
+}
+
+# Coordonnées approximatives des mairies des communes
+COMMUNES_COORDS = {
+    'Saint-Denis': (-20.8823, 55.4504), 'Saint-Paul': (-21.0096, 55.2707),
+    'Saint-Pierre': (-21.3393, 55.4781), 'Le Tampon': (-21.2779, 55.5177),
+    'Saint-Louis': (-21.2860, 55.4110), 'Saint-André': (-20.9633, 55.6503),
+    'Saint-Benoît': (-21.0339, 55.7128), 'Saint-Joseph': (-21.3779, 55.6192),
+    'Sainte-Marie': (-20.8968, 55.5496), 'Le Port': (-20.9373, 55.2919),
+    'La Possession': (-20.9250, 55.3358), 'Sainte-Suzanne': (-20.9061, 55.6069),
+    'Saint-Leu': (-21.1706, 55.2887), 'Petite-Île': (-21.3540, 55.5666),
+    "L'Étang-Salé": (-21.2653, 55.3667), 'Bras-Panon': (-21.0017, 55.6772),
+    'Entre-Deux': (-21.2469, 55.4717), 'Les Avirons': (-21.2414, 55.3392),
+    'Trois-Bassins': (-21.1040, 55.2983), 'Sainte-Rose': (-21.1286, 55.7939),
+    'Saint-Philippe': (-21.3589, 55.7675), 'La Plaine-des-Palmistes': (-21.1364, 55.6272),
+    'Cilaos': (-21.1346, 55.4717), 'Salazie': (-21.0272, 55.5392)
+}
+
+# Dispersion (en degrés) des projets sans coordonnées autour du centre de leur micro-région
+PROJET_COORDS_SPREAD = 0.05
+
+# Carte des projets : au-delà de cette limite, seuls des agrégats calculés côté serveur sont envoyés
+MAP_MARKER_LIMIT = 2000
+# Taille des cellules d'agrégation (en degrés) à partir de chaque niveau de zoom
+MAP_CLUSTER_LEVELS = ((0, 0.1), (11, 0.03), (13, 0.01))
+
+# Graphiques : points par trace au-delà desquels une série temporelle est réduite (LTTB),
+# un nuage de points passe en WebGL et les tableaux numériques sont envoyés en simple précision
+CHART_POINT_BUDGET = 2000
+SCATTERGL_THRESHOLD = 1000
+CHART_COMPACT_MIN = 1000
+
+# Adéquation offre/demande : plafonds de ressources mensuels (€) des logements ordinaires,
+# du moins cher au plus cher ; la demande au-delà du dernier plafond relève de l'accession
+PLAFONDS_RESSOURCES = {'PLAI': 1300, 'PLUS': 2400, 'PLS': 3100, 'Intermediaire': 4300}
+# Part de la demande des publics spécifiques, hors critère de ressources
+DEMANDE_SPECIFIQUE = {'Etudiant': 0.05, 'Senior': 0.08}
+# Dispersion des revenus des demandeurs autour du revenu moyen (loi log-logistique)
+DISPERSION_REVENUS = 0.35
+# Scénarios : croissance de la demande, facteur de rotation, construction neuve (part du parc par an)
+Scenario = namedtuple('Scenario', ['croissance_demande', 'rotation', 'construction'])
+SCENARIOS_ADEQUATION = {
+    'Tendanciel': Scenario(0.0, 1.0, 0.0),
+    'Relance de la construction': Scenario(0.0, 1.0, 0.03),
+    'Rotation accrue': Scenario(0.0, 1.25, 0.0),
+    'Hausse de la demande': Scenario(0.10, 1.0, 0.0)
+}
+
+# Projections Monte Carlo : horizon, nombre de scénarios et processus de calcul (par défaut un par cœur)
+PROJECTION_ANNEES = list(range(2025, 2041))
+PROJECTION_SCENARIOS = int(os.environ.get('BAILLEURS_PROJECTION_SCENARIOS', '10000'))
+PROJECTION_WORKERS = int(os.environ.get('BAILLEURS_PROJECTION_WORKERS', str(os.cpu_count() or 1)))
+# Taille des lots de scénarios, bornée pour qu'un lot tienne en mémoire quel que soit le nombre de bailleurs
+PROJECTION_LOT = 1000
+PROJECTION_LOT_VALEURS = 1_000_000
+PROJECTION_CENTILES = (5, 25, 50, 75, 95)
+# Intervalle (en secondes) de rafraîchissement du graphique pendant le calcul
+PROJECTION_POLL = 2
+HYPOTHESES_PROJECTION = Hypotheses(
+    derive_construction=0.01,       # croissance annuelle médiane de la construction
+    choc_construction=0.08,         # écart type du choc annuel commun aux bailleurs
+    volatilite_construction=0.10,   # écart type du choc annuel propre à chaque bailleur
+    taux_sortie=0.004,              # part du parc démolie ou vendue chaque année
+    inflation_couts=0.025,          # inflation annuelle moyenne du coût de construction
+    volatilite_couts=0.015,
+    retour_impayes=0.3,             # vitesse de retour des impayés vers le taux actuel
+    choc_impayes=0.25,              # chocs annuels des impayés (points), commun et propre
+    volatilite_impayes=0.3
+)
+# Indicateurs proposés : libellé, indicateur simulé et unité
+PROJECTION_INDICATEURS = {
+    'Parc total': ('parc', 'logements'),
+    'Construction annuelle': ('construction', 'logements/an'),
+    "Taux d'impayés": ('impayes', '%'),
+    'Investissement annuel': ('investissement', 'M€')
+}
+
+# Comparaison des bailleurs : nombre de lignes par page et colonne de tri de chaque clé « Trier par »
+BAILLEURS_PAGE_SIZE = 25
+BAILLEURS_SORT_KEYS = {
+    'Parc total': 'parc_total',
+    'CA': 'chiffre_affaires',
+    'Investissement': 'investissement_annuel',
+    'Performance': 'performance_order'
+}
+PERFORMANCE_ORDER = {'Excellente': 4, 'Élevée': 3, 'Moyenne': 2, 'Faible': 1}
+PERFORMANCE_CLASSES = {'Excellente': 'performance-excellent', 'Élevée': 'performance-high',
+                       'Moyenne': 'performance-medium'}
+
+# Schéma des tables : type explicite de chaque colonne chargée
+TABLE_SCHEMAS = {
+    'bailleurs': {
+        'nom': 'object', 'type': 'object', 'statut': 'object', 'annee_creation': 'int64',
+        'parc_total': 'int64', 'logements_gestion': 'int64', 'logements_construction_an': 'int64',
+        'chiffre_affaires': 'float64', 'effectifs': 'int64', 'taux_rotation': 'float64',
+        'taux_impayes': 'float64', 'dette_par_logement': 'int64', 'investissement_annuel': 'float64',
+        'performance_gestion': 'object', 'quartiers_prioritaires': 'int64',
+        'taux_renovation_energetique': 'int64', 'lat': 'float64', 'lon': 'float64',
+        'siege': 'object', 'description': 'object'
+    },
+    'parc': {
+        'bailleur': 'category', 'type_logement': 'category', 'nombre_logements': 'int64',
+        'proportion': 'float64', 'loyer_moyen': 'float64', 'taux_vacance': 'float64'
+    },
+    'historique': {
+        'date': 'datetime64[ns]', 'bailleur': 'category', 'parc_total': 'float64',
+        'logements_construits': 'float64', 'taux_impayes': 'float64', 'investissement': 'float64'
+    },
+    'projets': {
+        'nom_projet': 'string[pyarrow]', 'bailleur': 'category', 'micro_region': 'category', 'type_projet': 'category',
+        'logements_prevus': 'int64', 'investissement': 'float64', 'date_debut': 'datetime64[ns]',
+        'date_fin_prevue': 'datetime64[ns]', 'avancement': 'float64', 'statut': 'category',
+        'lat': 'float64', 'lon': 'float64'
+    },
+    'demande': {
+        'commune': 'object', 'demande_totale': 'int64', 'attente_moyenne_mois': 'float64',
+        'taux_satisfaction': 'float64', 'demande_urgence': 'int64', 'revenu_moyen_demandeur': 'float64'
+    },
+    'financement': {
+        'financeur': 'object', 'montant_annuel': 'float64', 'type_aide': 'object',
+        'taux_intervention': 'float64', 'projets_soutenus': 'int64'
+    }
+}
+
+# Clé identifiant une ligne de chaque table, pour les mises à jour incrémentales
+TABLE_KEYS = {
+    'bailleurs': ('nom',),
+    'parc': ('bailleur', 'type_logement'),
+    'historique': ('bailleur', 'date'),
+    'projets': ('nom_projet',),
+    'demande': ('commune',),
+    'financement': ('financeur',)
+}
+
+# Tables dont dépend chaque figure ou carte mémoïsée : seule une mise à jour de
+# l'une d'elles invalide la figure (sans entrée, toute mise à jour l'invalide)
+FIGURE_TABLES = {
+    'implantation_bailleurs': ('bailleurs',),
+    'ca_par_bailleur': ('bailleurs',),
+    'investissement_par_logement': ('bailleurs',),
+    'parc_par_bailleur': ('bailleurs',),
+    'production_par_bailleur': ('bailleurs',),
+    'impayes_par_bailleur': ('bailleurs',),
+    'rotation_par_bailleur': ('bailleurs',),
+    'renovation_par_bailleur': ('bailleurs',),
+    'renovation_performance': ('bailleurs',),
+    'top_parc': ('bailleurs',),
+    'top_investissement': ('bailleurs',),
+    'parc_par_type': ('parc',),
+    'loyer_par_type': ('parc',),
+    'vacance_par_bailleur': ('parc',),
+    'vacance_par_type': ('parc',),
+    'parc_bailleur_par_type': ('parc',),
+    'evolution_parc': ('historique',),
+    'evolution_investissement': ('historique',),
+    'carte_projets': ('projets',),
+    'avancement_par_bailleur': ('projets',),
+    'logements_par_type_projet': ('projets',),
+    'financements_par_organisme': ('financement',),
+    'montants_par_financeur': ('financement',),
+    'demande_par_commune': ('demande',),
+    'attente_par_commune': ('demande',),
+    'satisfaction_par_commune': ('demande',),
+    'revenu_satisfaction': ('demande',),
+    'adequation_offre_demande': ('bailleurs', 'demande'),
+    'couverture_commune_type': ('bailleurs', 'parc', 'projets', 'demande'),
+    'deficit_par_scenario': ('bailleurs', 'parc', 'projets', 'demande'),
+    'projections': ('bailleurs',)
+}
+
+# Colonnes facultatives : chargées seulement si la source les fournit
+OPTIONAL_COLUMNS = {
+    'projets': ('lat', 'lon')
+}
+
+class DataSource:
+    """Source des tables du dashboard (bailleurs, parc, historique, projets, demande, financement)"""
+    
+    def load(self, table, columns=None):
+        """Charge une table, restreinte aux colonnes demandées (toutes celles du schéma par défaut)"""
+        raise NotImplementedError
+    
+    def fingerprint(self):
+        """Empreinte stable du contenu de la source, identique dans tous les processus"""
+        raise NotImplementedError
+    
+    def stored_columns(self, table):
+        """Colonnes effectivement présentes dans la source pour une table"""
+        return list(TABLE_SCHEMAS[table])
+    
+    def columns(self, table, columns=None):
+        """Valide les colonnes demandées par rapport au schéma de la table
+        
+        Par défaut, toutes les colonnes du schéma, les colonnes facultatives
+        n'étant retenues que si la source les contient.
+        """
+        schema = TABLE_SCHEMAS[table]
+        if columns is None:
+            optional = OPTIONAL_COLUMNS.get(table, ())
+            stored = set(self.stored_columns(table)) if optional else set()
+            return [col for col in schema if col not in optional or col in stored]
+        unknown = [col for col in columns if col not in schema]
+        if unknown:
+            raise ValueError(f"Colonnes inconnues pour la table '{table}': {unknown}")
+        return list(columns)
+    
+    def dtypes(self, table, columns):
+        """Types explicites des colonnes, séparés entre dates et autres colonnes"""
+        schema = TABLE_SCHEMAS[table]
+        dates = [col for col in columns if schema[col].startswith('datetime')]
+        others = {col: schema[col] for col in columns if col not in dates}
+        return dates, others
+
+class SyntheticDataSource(DataSource):
+    """Données simulées par tirages NumPy vectorisés, issus d'un unique générateur
+    
+    Les tailles sont paramétrables pour les tests de charge : par défaut, les 7 bailleurs
+    de référence, 50 projets, 10 communes et une année d'historique par an depuis 2015.
+    Au-delà des 7 bailleurs de référence, des bailleurs fictifs sont générés.
+    """
+    
+    def __init__(self, seed=DATA_SEED, bailleurs=None, projets=50, communes=10, annees=None):
+        self.seed = seed
+        self.n_bailleurs = bailleurs
+        self.n_projets = projets
+        self.n_communes = communes
+        self.n_annees = annees
+        # Date de référence à la journée : les dates simulées sont identiques dans tous les workers
+        self.reference_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        self._tables = None
+    
+    def load(self, table, columns=None):
+        if self._tables is None:
+            self._tables = self.generate_tables()
+        return self._tables[table][self.columns(table, columns)]
+    
+    def stored_columns(self, table):
+        if self._tables is None:
+            self._tables = self.generate_tables()
+        return list(self._tables[table].columns)
+    
+    def fingerprint(self):
+        params = (self.seed, self.n_bailleurs, self.n_projets, self.n_communes, self.n_annees,
+                  self.reference_date.date().isoformat())
+        return f"synthetic-{stable_digest(*params):016x}"
+    
+    def rng_for(self, *key):
+        """Flux aléatoire propre à une entité (table, bailleur, commune...)"""
+        return entity_rng(self.seed, *key)
+    
+    def generate_tables(self):
+        """Génère l'ensemble des tables simulées"""
+        bailleurs = self.generate_bailleurs()
+        return {
+            'bailleurs': bailleurs,
+            'parc': self.generate_parc(bailleurs),
+            'historique': self.generate_historique(bailleurs),
+            'projets': self.generate_projets(bailleurs),
+            'demande': self.generate_demande(),
+            'financement': self.generate_financement()
+        }
+    
     def define_bailleurs_data(self):
         """Définit les données des bailleurs sociaux de La Réunion"""
         return [
@@ -255,112 +986,1608 @@ class BailleursSociauxDashboard:
             }
         ]
     
-    def initialize_parc_data(self):
-        """Initialise les données détaillées du parc par bailleur"""
-        data = []
-        types_logement = ['PLAI', 'PLUS', 'PLS', 'Intermediaire', 'Accession', 'Etudiant', 'Senior']
+    def generate_bailleurs(self):
+        """Bailleurs de référence, complétés si besoin par des bailleurs fictifs"""
+        reference = pd.DataFrame(self.define_bailleurs_data())
+        n = len(reference) if self.n_bailleurs is None else self.n_bailleurs
+        if n <= len(reference):
+            return reference.iloc[:n].reset_index(drop=True)
         
-        for bailleur in self.bailleurs_data:
-            # Répartition aléatoire mais cohérente des types de logement
-            np.random.seed(hash(bailleur['nom']) % 10000)
+        n_extra = n - len(reference)
+        rng = self.rng_for('bailleurs')
+        parc = np.round(rng.lognormal(7.5, 0.8, n_extra)).astype('int64') + 100
+        sieges = rng.integers(0, len(reference), n_extra)
+        extra = pd.DataFrame({
+            'nom': [f"Bailleur {i}" for i in range(len(reference) + 1, n + 1)],
+            'type': np.array(['Groupe', 'SEM', 'HLM', 'Promoteur', 'Association'], dtype=object)[rng.integers(0, 5, n_extra)],
+            'statut': 'Bailleur simulé',
+            'annee_creation': rng.integers(1960, 2020, n_extra),
+            'parc_total': parc,
+            'logements_gestion': parc,
+            'logements_construction_an': (parc * rng.uniform(0.02, 0.06, n_extra)).astype('int64'),
+            'chiffre_affaires': np.round(parc * rng.uniform(0.005, 0.01, n_extra), 1),
+            'effectifs': (parc * rng.uniform(0.01, 0.03, n_extra)).astype('int64') + 5,
+            'taux_rotation': np.round(rng.uniform(6, 15, n_extra), 1),
+            'taux_impayes': np.round(rng.uniform(1.5, 4.5, n_extra), 1),
+            'dette_par_logement': rng.integers(18000, 42000, n_extra),
+            'investissement_annuel': np.round(parc * rng.uniform(0.002, 0.006, n_extra), 1),
+            'performance_gestion': np.array(['Excellente', 'Élevée', 'Moyenne', 'Faible'], dtype=object)[rng.integers(0, 4, n_extra)],
+            'quartiers_prioritaires': rng.integers(2, 45, n_extra),
+            'taux_renovation_energetique': rng.integers(15, 50, n_extra),
+            'lat': reference['lat'].to_numpy()[sieges] + rng.uniform(-0.02, 0.02, n_extra),
+            'lon': reference['lon'].to_numpy()[sieges] + rng.uniform(-0.02, 0.02, n_extra),
+            'siege': reference['siege'].to_numpy()[sieges],
+            'description': 'Bailleur fictif pour les tests de charge'
+        })
+        return pd.concat([reference, extra], ignore_index=True)
+    
+    def generate_parc(self, bailleurs):
+        """Répartition du parc de chaque bailleur par type de logement"""
+        n_bailleurs, n_types = len(bailleurs), len(TYPES_LOGEMENT)
+        
+        # Un flux par bailleur : sa répartition ne dépend ni de l'ordre ni du nombre de bailleurs
+        draws = np.stack([self.rng_for('parc', nom).uniform(size=(3, n_types)) for nom in bailleurs['nom']], axis=1)
+        proportion = 5 + 25 * draws[0]
+        nombre = (bailleurs['parc_total'].to_numpy()[:, None] * proportion / 100).astype('int64')
+        
+        return pd.DataFrame({
+            'bailleur': pd.Categorical.from_codes(np.repeat(np.arange(n_bailleurs), n_types), bailleurs['nom']),
+            'type_logement': pd.Categorical.from_codes(np.tile(np.arange(n_types), n_bailleurs), TYPES_LOGEMENT),
+            'nombre_logements': nombre.ravel(),
+            'proportion': proportion.ravel(),
+            'loyer_moyen': (150 + 300 * draws[1]).ravel(),
+            'taux_vacance': (1 + 7 * draws[2]).ravel()
+        })
+    
+    def generate_historique(self, bailleurs):
+        """Historique annuel par bailleur, avec une tendance de +3%/an depuis 2015"""
+        if self.n_annees is None:
+            dates = pd.date_range('2015-01-01', datetime.now(), freq='Y')
+        else:
+            dates = pd.date_range('2015-01-01', periods=self.n_annees, freq='Y')
+        n_dates, n_bailleurs = len(dates), len(bailleurs)
+        
+        trend_factor = np.repeat(1 + (dates.year.to_numpy() - 2015) * 0.03, n_bailleurs)
+        bruit = np.stack([self.rng_for('historique', nom).normal(0, 0.1, n_dates) for nom in bailleurs['nom']], axis=1)
+        
+        def par_date(column):
+            return np.tile(bailleurs[column].to_numpy(dtype='float64'), n_dates)
+        
+        return pd.DataFrame({
+            'date': np.repeat(dates.to_numpy(), n_bailleurs),
+            'bailleur': pd.Categorical.from_codes(np.tile(np.arange(n_bailleurs), n_dates), bailleurs['nom']),
+            'parc_total': par_date('parc_total') * 0.8 * trend_factor,
+            'logements_construits': par_date('logements_construction_an') * 0.9 * trend_factor,
+            'taux_impayes': par_date('taux_impayes') * (1 + bruit.ravel()),
+            'investissement': par_date('investissement_annuel') * 0.8 * trend_factor
+        })
+    
+    def generate_projets(self, bailleurs):
+        """Projets en cours, tirés en un seul lot"""
+        rng = self.rng_for('projets', self.n_projets)
+        n = self.n_projets
+        now = np.datetime64(self.reference_date, 'ns')
+        day = np.timedelta64(1, 'D')
+        
+        region_codes = rng.integers(0, len(MICROREGIONS), n)
+        bailleur_codes = rng.integers(0, len(bailleurs), n)
+        
+        # Noms construits en colonnes Arrow : bien plus rapide qu'une f-string par ligne
+        regions = pa.array(MICROREGIONS)
+        nom_projet = pc.binary_join_element_wise(
+            'Projet ', pc.cast(pa.array(np.arange(1, n + 1)), pa.string()),
+            ' - ', regions.take(region_codes), '')
+        
+        return pd.DataFrame({
+            'nom_projet': pd.Series(nom_projet, dtype='string[pyarrow]'),
+            'bailleur': pd.Categorical.from_codes(bailleur_codes, bailleurs['nom']),
+            'micro_region': pd.Categorical.from_codes(region_codes, MICROREGIONS),
+            'type_projet': pd.Categorical.from_codes(rng.integers(0, len(TYPES_PROJET), n), TYPES_PROJET),
+            'logements_prevus': rng.integers(20, 200, n),
+            'investissement': rng.uniform(5, 50, n),
+            'date_debut': now - rng.integers(0, 365, n) * day,
+            'date_fin_prevue': now + rng.integers(180, 720, n) * day,
+            'avancement': rng.uniform(10, 95, n),
+            'statut': pd.Categorical.from_codes(rng.integers(0, len(STATUTS_PROJET), n), STATUTS_PROJET)
+        })
+    
+    def generate_demande(self):
+        """Demande de logement social par commune"""
+        communes = COMMUNES_REUNION[:self.n_communes]
+        communes += [f"Zone {i}" for i in range(len(communes) + 1, self.n_communes + 1)]
+        draws = np.array([self.rng_for('demande', commune).uniform(size=5) for commune in communes]).reshape(-1, 5)
+        
+        return pd.DataFrame({
+            'commune': communes,
+            'demande_totale': (800 + 2700 * draws[:, 0]).astype('int64'),
+            'attente_moyenne_mois': 18 + 30 * draws[:, 1],
+            'taux_satisfaction': 15 + 25 * draws[:, 2],
+            'demande_urgence': (50 + 250 * draws[:, 3]).astype('int64'),
+            'revenu_moyen_demandeur': 1200 + 1000 * draws[:, 4]
+        })
+    
+    def generate_financement(self):
+        """Financements annuels par organisme"""
+        financeurs = ['État', 'Région', 'Département', 'ANRU', 'Europe', 'Action Logement', 'CDC']
+        draws = np.array([self.rng_for('financement', financeur).uniform(size=4) for financeur in financeurs])
+        
+        return pd.DataFrame({
+            'financeur': financeurs,
+            'montant_annuel': 10 + 90 * draws[:, 0],
+            'type_aide': np.array(['Subvention', 'Prêt', 'Avance', 'Garantie'], dtype=object)[(4 * draws[:, 1]).astype('int64')],
+            'taux_intervention': 10 + 30 * draws[:, 2],
+            'projets_soutenus': (5 + 25 * draws[:, 3]).astype('int64')
+        })
+
+def files_fingerprint(prefix, paths):
+    """Empreinte d'un ensemble de fichiers, d'après leur taille et leur date de modification"""
+    stats = [(os.path.basename(path), os.stat(path).st_size, os.stat(path).st_mtime_ns)
+             for path in paths if os.path.exists(path)]
+    return f"{prefix}-{stable_digest(*stats):016x}"
+
+class CSVDataSource(DataSource):
+    """Tables stockées en fichiers CSV (<table>.csv) dans un répertoire"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+    
+    def fingerprint(self):
+        return files_fingerprint('csv', [os.path.join(self.directory, f'{table}.csv') for table in TABLE_SCHEMAS])
+    
+    def stored_columns(self, table):
+        return list(pd.read_csv(os.path.join(self.directory, f'{table}.csv'), nrows=0).columns)
+    
+    def load(self, table, columns=None):
+        columns = self.columns(table, columns)
+        dates, dtypes = self.dtypes(table, columns)
+        # Moteur pyarrow systématique : pyarrow est une dépendance requise du dashboard
+        # (colonnes string[pyarrow], instantanés Arrow), il n'y a pas de repli
+        return pd.read_csv(os.path.join(self.directory, f'{table}.csv'),
+                           usecols=columns,
+                           dtype=dtypes,
+                           parse_dates=dates,
+                           engine='pyarrow')[columns]
+
+class ParquetDataSource(DataSource):
+    """Tables stockées en fichiers Parquet (<table>.parquet) dans un répertoire"""
+    
+    def __init__(self, directory):
+        self.directory = directory
+    
+    def fingerprint(self):
+        return files_fingerprint('parquet', [os.path.join(self.directory, f'{table}.parquet') for table in TABLE_SCHEMAS])
+    
+    def stored_columns(self, table):
+        return pq.read_schema(os.path.join(self.directory, f'{table}.parquet')).names
+    
+    def load(self, table, columns=None):
+        columns = self.columns(table, columns)
+        _, dtypes = self.dtypes(table, columns)
+        frame = pd.read_parquet(os.path.join(self.directory, f'{table}.parquet'), columns=columns)
+        return frame.astype(dtypes)
+
+class SQLiteDataSource(DataSource):
+    """Tables stockées dans une base SQLite locale"""
+    
+    def __init__(self, path):
+        self.path = path
+    
+    def fingerprint(self):
+        return files_fingerprint('db', [self.path])
+    
+    def query(self, table, columns):
+        column_list = ', '.join(f'"{col}"' for col in columns)
+        return f'SELECT {column_list} FROM "{table}"'
+    
+    def stored_columns(self, table):
+        return self.fetch(f"PRAGMA table_info('{table}')")['name'].tolist()
+    
+    def fetch(self, sql):
+        with sqlite3.connect(f'file:{self.path}?mode=ro', uri=True) as conn:
+            return pd.read_sql_query(sql, conn)
+    
+    def load(self, table, columns=None):
+        columns = self.columns(table, columns)
+        dates, dtypes = self.dtypes(table, columns)
+        frame = self.fetch(self.query(table, columns))
+        for col in dates:
+            frame[col] = pd.to_datetime(frame[col])
+        return frame.astype(dtypes)
+
+class DuckDBDataSource(SQLiteDataSource):
+    """Tables stockées dans une base DuckDB locale (module duckdb requis)"""
+    
+    def fetch(self, sql):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("La source DuckDB nécessite le module duckdb: pip install duckdb")
+        with duckdb.connect(self.path, read_only=True) as conn:
+            return conn.execute(sql).df()
+
+DATA_SOURCES = {
+    'csv': CSVDataSource,
+    'parquet': ParquetDataSource,
+    'sqlite': SQLiteDataSource,
+    'duckdb': DuckDBDataSource
+}
+
+def data_source_from_uri(uri, seed=DATA_SEED):
+    """Instancie la source décrite par une URI 'type:chemin' (ex. 'parquet:/data/bailleurs')
+    
+    La source simulée accepte des tailles en paramètres, par exemple
+    'synthetic?bailleurs=500&projets=1000000&communes=24&annees=10&seed=7'.
+    """
+    if uri.partition('?')[0] == 'synthetic':
+        params = {key: int(value) for key, value in parse_qsl(uri.partition('?')[2])}
+        params.setdefault('seed', seed)
+        return SyntheticDataSource(**params)
+    kind, _, path = uri.partition(':')
+    if kind not in DATA_SOURCES or not path:
+        raise ValueError(f"Source de données invalide: '{uri}' (attendu: synthetic, csv:, parquet:, sqlite: ou duckdb:)")
+    return DATA_SOURCES[kind](path)
+
+class GroupIndex:
+    """Positions des lignes d'un DataFrame regroupées par valeur d'une colonne catégorielle
+    
+    L'index est construit au premier accès (tri stable des codes, linéaire pour des
+    codes entiers) ; chaque tranche est ensuite obtenue sans parcourir la table.
+    """
+    
+    def __init__(self, frame, column):
+        self.frame = frame
+        self.column = column
+        self.columns = (column,)
+        self._positions = None
+    
+    def build(self):
+        codes = self.frame[self.column].cat.codes.to_numpy()
+        categories = self.frame[self.column].cat.categories
+        order = np.argsort(codes, kind='stable')
+        # Les valeurs manquantes (code -1) sont triées en tête et ignorées
+        counts = np.bincount(codes + 1, minlength=len(categories) + 1)
+        bounds = np.cumsum(counts)
+        self._positions = {
+            category: order[bounds[i]:bounds[i + 1]] for i, category in enumerate(categories)
+        }
+    
+    def positions(self, value):
+        """Positions des lignes ayant la valeur donnée"""
+        if self._positions is None:
+            self.build()
+        return self._positions.get(value, np.empty(0, dtype='int64'))
+    
+    def get(self, value):
+        """Lignes ayant la valeur donnée"""
+        return self.frame.take(self.positions(value))
+    
+    def rebased(self, frame):
+        """Même index sur une nouvelle version de la table, aux lignes et colonnes indexées identiques"""
+        index = copy.copy(self)
+        index.frame = frame
+        return index
+
+def locate_projets(projets, seed):
+    """Fixe une fois pour toutes les coordonnées des projets
+    
+    Les coordonnées fournies par la source sont conservées. À défaut, le projet est
+    placé autour du centre de sa micro-région, avec un décalage déterministe dérivé
+    de son nom : il reste au même endroit d'un rafraîchissement à l'autre.
+    """
+    n = len(projets)
+    lat = projets['lat'].to_numpy(dtype='float64', copy=True) if 'lat' in projets else np.full(n, np.nan)
+    lon = projets['lon'].to_numpy(dtype='float64', copy=True) if 'lon' in projets else np.full(n, np.nan)
+    missing = np.isnan(lat) | np.isnan(lon)
+    
+    if missing.any():
+        centres = np.array([MICROREGION_COORDS.get(region, (np.nan, np.nan))
+                            for region in projets['micro_region'].cat.categories]).reshape(-1, 2)
+        centres = np.vstack([centres, [np.nan, np.nan]])  # code -1 : micro-région inconnue
+        region_codes = projets['micro_region'].cat.codes.to_numpy()[missing]
+        hashes = pd.util.hash_pandas_object(projets['nom_projet'][missing], index=False,
+                                            hash_key=f"{stable_digest(seed, 'coordonnees'):016x}").to_numpy()
+        offsets = np.stack([hashes & 0xFFFFFFFF, hashes >> np.uint64(32)], axis=1) / 2.0 ** 32
+        located = centres[region_codes] + PROJET_COORDS_SPREAD * (2 * offsets - 1)
+        lat[missing], lon[missing] = located[:, 0], located[:, 1]
+    
+    return projets.assign(lat=lat, lon=lon)
+
+def nearest_commune(lat, lon, chunk=100_000):
+    """Indice dans COMMUNES_COORDS de la commune la plus proche de chaque point
+    
+    Distance équirectangulaire, suffisante à l'échelle de l'île ; le calcul est
+    vectorisé par blocs pour borner la mémoire. Les points sans coordonnées valent -1.
+    """
+    lat, lon = np.atleast_1d(lat).astype('float64'), np.atleast_1d(lon).astype('float64')
+    communes = np.array(list(COMMUNES_COORDS.values()))
+    scale = np.cos(np.radians(communes[:, 0].mean()))
+    nearest = np.full(len(lat), -1, dtype='int64')
+    for start in range(0, len(lat), chunk):
+        d_lat = lat[start:start + chunk, None] - communes[None, :, 0]
+        d_lon = (lon[start:start + chunk, None] - communes[None, :, 1]) * scale
+        distances = d_lat ** 2 + d_lon ** 2
+        valid = ~np.isnan(distances[:, 0])
+        nearest[start:start + chunk][valid] = distances[valid].argmin(axis=1)
+    return nearest
+
+class SpatialIndex:
+    """Index en grille des positions (colonnes lat/lon) des lignes d'un DataFrame
+    
+    Les lignes sont triées une fois par cellule de grille : une requête par emprise
+    ne parcourt que les cellules recouvertes, et la commune la plus proche de chaque
+    ligne n'est calculée qu'une fois. L'index d'une sélection de lignes (`rows`,
+    masque ou positions) d'une table déjà indexée (`parent`) reprend les communes
+    du parent au lieu de les recalculer.
+    """
+    
+    def __init__(self, frame, cell=0.02, parent=None, rows=None):
+        self.frame = frame
+        self.columns = ('lat', 'lon')
+        self.cell = cell
+        self.parent = parent
+        self.rows = rows
+        self._order = None
+        self._communes = None
+    
+    def build(self):
+        lat = self.frame['lat'].to_numpy(dtype='float64')
+        lon = self.frame['lon'].to_numpy(dtype='float64')
+        valid = ~(np.isnan(lat) | np.isnan(lon))
+        rows = np.floor(lat / self.cell).astype('int64', copy=False)
+        cols = np.floor(lon / self.cell).astype('int64', copy=False)
+        if valid.any():
+            self.origin = (rows[valid].min(), cols[valid].min())
+            self.shape = (rows[valid].max() - self.origin[0] + 1, cols[valid].max() - self.origin[1] + 1)
+        else:
+            self.origin, self.shape = (0, 0), (0, 0)
+        # Identifiant de cellule ligne par ligne ; les lignes sans coordonnées (-1) sont en tête
+        cells = np.where(valid, (rows - self.origin[0]) * self.shape[1] + (cols - self.origin[1]), -1)
+        self._order = np.argsort(cells, kind='stable')
+        self._cells = cells[self._order]
+        self._lat, self._lon = lat, lon
+    
+    def within(self, south, west, north, east):
+        """Positions (triées) des lignes situées dans l'emprise donnée"""
+        if self._order is None:
+            self.build()
+        row_min = max(int(np.floor(south / self.cell)) - self.origin[0], 0)
+        row_max = min(int(np.floor(north / self.cell)) - self.origin[0], self.shape[0] - 1)
+        col_min = max(int(np.floor(west / self.cell)) - self.origin[1], 0)
+        col_max = min(int(np.floor(east / self.cell)) - self.origin[1], self.shape[1] - 1)
+        if row_min > row_max or col_min > col_max:
+            return np.empty(0, dtype='int64')
+        
+        # Sur chaque ligne de la grille, les cellules recouvertes sont contiguës
+        first = np.arange(row_min, row_max + 1) * self.shape[1] + col_min
+        starts = np.searchsorted(self._cells, first, side='left')
+        stops = np.searchsorted(self._cells, first + (col_max - col_min), side='right')
+        candidates = np.concatenate([self._order[a:b] for a, b in zip(starts, stops)])
+        lat, lon = self._lat[candidates], self._lon[candidates]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return np.sort(candidates[inside])
+    
+    def get(self, south, west, north, east):
+        """Lignes situées dans l'emprise donnée"""
+        return self.frame.take(self.within(south, west, north, east))
+    
+    def communes(self):
+        """Commune la plus proche de chaque ligne (catégorielle, alignée sur le DataFrame)"""
+        if self._communes is None:
+            if self.parent is not None:
+                self._communes = self.parent.communes()[self.rows]
+            else:
+                codes = nearest_commune(self.frame['lat'].to_numpy(dtype='float64'),
+                                        self.frame['lon'].to_numpy(dtype='float64'))
+                self._communes = pd.Categorical.from_codes(codes, list(COMMUNES_COORDS))
+        return self._communes
+    
+    rebased = GroupIndex.rebased
+
+class FilteredView(namedtuple('FilteredView', ['key', 'bailleurs', 'parc', 'historique', 'projets', 'indices'])):
+    """Tables filtrées selon les contrôles de la sidebar"""
+    
+    def slice(self, table, column, value):
+        """Lignes d'une table filtrée pour une valeur de dimension (bailleur, micro-région...)"""
+        index = self.indices.get((table, column))
+        if index is None:
+            index = self.indices.setdefault((table, column), GroupIndex(getattr(self, table), column))
+        return index.get(value)
+    
+    def spatial(self, table='projets'):
+        """Index spatial d'une table filtrée (emprises, commune la plus proche)"""
+        index = self.indices.get((table, 'coords'))
+        if index is None:
+            index = self.indices.setdefault((table, 'coords'), SpatialIndex(getattr(self, table)))
+        return index
+
+class FilterEngine:
+    """Applique les filtres de la sidebar aux tables du jeu de données
+    
+    Les masques booléens sont calculés une fois par critère et réutilisés entre
+    combinaisons ; les vues filtrées sont mémoïsées par combinaison de filtres.
+    Après une ingestion, les index et masques des tables inchangées sont repris
+    du moteur de la version précédente (`previous`), de même que les index des
+    tables mises à jour sans ajout de lignes ni changement des colonnes indexées.
+    """
+    
+    def __init__(self, dataset, previous=None, deltas=None, max_views=32, max_masks=256):
+        self.bailleurs = [b['nom'] for b in dataset['bailleurs_data']]
+        self.parc = dataset['parc_data']
+        self.historique = dataset['historical_data']
+        self.projets = dataset['projets_data']
+        self.max_views = max_views
+        self.max_masks = max_masks
+        
+        # Index par bailleur et par micro-région des tables complètes, réutilisés par
+        # toute vue qui n'en filtre pas les lignes
+        self.base_indices = {
+            ('parc', 'bailleur'): GroupIndex(self.parc, 'bailleur'),
+            ('historique', 'bailleur'): GroupIndex(self.historique, 'bailleur'),
+            ('projets', 'bailleur'): GroupIndex(self.projets, 'bailleur'),
+            ('projets', 'micro_region'): GroupIndex(self.projets, 'micro_region'),
+            ('projets', 'coords'): SpatialIndex(self.projets)
+        }
+        self._masks = {}
+        reused = set()
+        if previous is not None:
+            unchanged = {table for table in ('parc', 'historique', 'projets')
+                         if getattr(previous, table) is getattr(self, table)}
+            self._masks = {key: mask for key, mask in previous._masks.items() if key[0] in unchanged}
+            for key in self.base_indices:
+                index = previous.base_indices[key]
+                if key[0] in unchanged:
+                    self.base_indices[key] = index
+                    reused.add(key)
+                elif self.preserves(index.columns, (deltas or {}).get(key[0])):
+                    self.base_indices[key] = index.rebased(getattr(self, key[0]))
+                    reused.add(key)
+        for key, index in self.base_indices.items():
+            if key not in reused:
+                index.build()
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def preserves(columns, deltas):
+        """Vrai si des mises à jour n'ont ni ajouté de lignes ni modifié les colonnes données"""
+        if not deltas:
+            return False
+        return all(
+            len(removed) == len(added) and all(
+                removed[col].reset_index(drop=True).equals(added[col].reset_index(drop=True)) for col in columns)
+            for removed, added in deltas)
+    
+    @staticmethod
+    def filter_key(controls=None):
+        """Clé normalisée d'une combinaison de filtres (une sélection vide vaut 'tous')"""
+        controls = controls or {}
+        bailleurs = tuple(sorted(controls.get('bailleurs_selectionnes') or ()))
+        types = tuple(sorted(controls.get('types_logement') or ()))
+        debut = controls.get('date_debut')
+        fin = controls.get('date_fin')
+        return (bailleurs, types,
+                pd.Timestamp(debut) if debut else None,
+                pd.Timestamp(fin) + pd.Timedelta(days=1) if fin else None)
+    
+    def apply(self, controls=None):
+        """Vue filtrée des tables pour les contrôles de la sidebar"""
+        key = self.filter_key(controls)
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+                self.hits += 1
+                return view
+            self.misses += 1
+        
+        bailleurs, types, debut, fin = key
+        parc_mask = self.mask('parc', 'bailleur', bailleurs, lambda: self.parc['bailleur'].isin(bailleurs))
+        parc_mask = parc_mask & self.mask('parc', 'type_logement', types, lambda: self.parc['type_logement'].isin(types))
+        
+        historique_mask = self.mask('historique', 'bailleur', bailleurs, lambda: self.historique['bailleur'].isin(bailleurs))
+        historique_mask = historique_mask & self.mask('historique', 'debut', debut, lambda: self.historique['date'] >= debut)
+        historique_mask = historique_mask & self.mask('historique', 'fin', fin, lambda: self.historique['date'] < fin)
+        
+        # Un projet est retenu si sa période [début, fin prévue] recoupe la période analysée
+        projets_mask = self.mask('projets', 'bailleur', bailleurs, lambda: self.projets['bailleur'].isin(bailleurs))
+        projets_mask = projets_mask & self.mask('projets', 'debut', debut, lambda: self.projets['date_fin_prevue'] >= debut)
+        projets_mask = projets_mask & self.mask('projets', 'fin', fin, lambda: self.projets['date_debut'] < fin)
+        
+        frames = {
+            'parc': self.select(self.parc, parc_mask),
+            'historique': self.select(self.historique, historique_mask),
+            'projets': self.select(self.projets, projets_mask)
+        }
+        indices = {key: index for key, index in self.base_indices.items() if index.frame is frames[key[0]]}
+        if ('projets', 'coords') not in indices:
+            # Communes des projets retenus lues dans l'index de la table complète
+            indices[('projets', 'coords')] = SpatialIndex(frames['projets'], parent=self.base_indices[('projets', 'coords')],
+                                                          rows=projets_mask)
+        view = FilteredView(
+            key=key,
+            bailleurs=[nom for nom in self.bailleurs if not bailleurs or nom in bailleurs],
+            indices=indices,
+            **frames
+        )
+        
+        with self._lock:
+            self._views[key] = view
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+        return view
+    
+    def mask(self, table, column, value, compute):
+        """Masque d'un critère, calculé une seule fois ; True si le critère est inactif"""
+        if value is None or value == ():
+            return True
+        key = (table, column, value)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = compute().to_numpy()
+            with self._lock:
+                if len(self._masks) >= self.max_masks:
+                    self._masks.clear()
+                self._masks[key] = mask
+        return mask
+    
+    @staticmethod
+    def select(frame, mask):
+        """Applique un masque, sans copie quand aucun critère n'est actif"""
+        if mask is True:
+            return frame
+        return frame[mask]
+
+def cluster_points(lat, lon, cell, **weights):
+    """Regroupe des points par cellule de grille carrée (en degrés)
+    
+    Retourne pour chaque cellule non vide la position moyenne, le nombre de points
+    et la somme de chacun des poids fournis.
+    """
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    lat, lon = lat[valid], lon[valid]
+    rows = np.floor(lat / cell).astype('int64')
+    cols = np.floor(lon / cell).astype('int64')
+    _, inverse = np.unique(rows * (1 << 32) + cols, return_inverse=True)
+    count = np.bincount(inverse)
+    
+    clusters = {
+        'lat': np.bincount(inverse, weights=lat) / count,
+        'lon': np.bincount(inverse, weights=lon) / count,
+        'count': count
+    }
+    for name, values in weights.items():
+        clusters[name] = np.bincount(inverse, weights=values[valid])
+    return clusters
+
+_zoom_level_layers = None
+
+def zoom_level_layers(levels):
+    """Élément folium qui affiche, parmi plusieurs couches, celle du niveau de zoom courant
+    
+    La classe dérive d'un élément branca : elle n'est définie qu'au premier appel,
+    une fois folium chargé.
+    """
+    global _zoom_level_layers
+    if _zoom_level_layers is None:
+        from branca.element import MacroElement
+        from jinja2 import Template
+        
+        class ZoomLevelLayers(MacroElement):
+            """Affiche, parmi plusieurs couches, celle qui correspond au niveau de zoom courant"""
             
-            for type_log in types_logement:
-                proportion = np.random.uniform(5, 30)
-                nombre = int(bailleur['parc_total'] * proportion / 100)
-                loyer_moyen = np.random.uniform(150, 450)
-                vacance = np.random.uniform(1, 8)
-                
-                data.append({
-                    'bailleur': bailleur['nom'],
-                    'type_logement': type_log,
-                    'nombre_logements': nombre,
-                    'proportion': proportion,
-                    'loyer_moyen': loyer_moyen,
-                    'taux_vacance': vacance
-                })
+            _template = Template("""
+                {% macro script(this, kwargs) %}
+                (function () {
+                    var map = {{ this._parent.get_name() }};
+                    var levels = [{% for min_zoom, layer in this.levels %}[{{ min_zoom }}, {{ layer.get_name() }}]{{ "," if not loop.last }}{% endfor %}];
+                    function update() {
+                        var zoom = map.getZoom(), active = levels[0][1];
+                        levels.forEach(function (level) { if (zoom >= level[0]) { active = level[1]; } });
+                        levels.forEach(function (level) {
+                            if (level[1] === active) { map.addLayer(level[1]); } else { map.removeLayer(level[1]); }
+                        });
+                    }
+                    map.on('zoomend', update);
+                    update();
+                })();
+                {% endmacro %}
+            """)
+            
+            def __init__(self, levels):
+                super().__init__()
+                self._name = 'ZoomLevelLayers'
+                self.levels = levels
         
-        return pd.DataFrame(data)
+        _zoom_level_layers = ZoomLevelLayers
+    return _zoom_level_layers(levels)
+
+class Cube:
+    """Agrégat dense : sommes de mesures pour chaque cellule d'un produit de dimensions catégorielles"""
     
-    def initialize_historical_data(self):
-        """Initialise les données historiques"""
-        dates = pd.date_range('2015-01-01', datetime.now(), freq='Y')
-        data = []
+    def __init__(self, frame, dimensions, measures):
+        self.dimensions = dimensions
+        self.measures = measures
+        self.categories = [list(frame[dim].cat.categories) for dim in dimensions]
+        self.positions = [{value: i for i, value in enumerate(cats)} for cats in self.categories]
+        shape = tuple(len(cats) for cats in self.categories)
         
-        for date in dates:
-            for bailleur in self.bailleurs_data:
-                years_passed = date.year - 2015
-                trend_factor = 1 + (years_passed * 0.03)
-                
-                data.append({
-                    'date': date,
-                    'bailleur': bailleur['nom'],
-                    'parc_total': bailleur['parc_total'] * 0.8 * trend_factor,
-                    'logements_construits': bailleur['logements_construction_an'] * 0.9 * trend_factor,
-                    'taux_impayes': bailleur['taux_impayes'] * (1 + np.random.normal(0, 0.1)),
-                    'investissement': bailleur['investissement_annuel'] * 0.8 * trend_factor
-                })
+        # Indice de cellule de chaque ligne (les lignes sans dimension renseignée sont ignorées)
+        codes = [frame[dim].cat.codes.to_numpy() for dim in dimensions]
+        valid = np.logical_and.reduce([c >= 0 for c in codes])
+        cells = np.ravel_multi_index([c[valid] for c in codes], shape) if len(shape) else np.zeros(0, dtype='int64')
+        size = int(np.prod(shape))
+        
+        self.cells = {'count': np.bincount(cells, minlength=size).reshape(shape)}
+        for measure in measures:
+            values = frame[measure].to_numpy()[valid]
+            total = np.bincount(cells, weights=values, minlength=size).reshape(shape)
+            if np.issubdtype(values.dtype, np.integer):
+                total = np.rint(total).astype('int64')
+            self.cells[measure] = total
+    
+    @classmethod
+    def restored(cls, dimensions, measures, categories, cells):
+        """Cube reconstitué à partir de cellules déjà calculées (instantané sur disque)"""
+        cube = cls.__new__(cls)
+        cube.dimensions = tuple(dimensions)
+        cube.measures = tuple(measures)
+        cube.categories = [list(cats) for cats in categories]
+        cube.positions = [{value: i for i, value in enumerate(cats)} for cats in cube.categories]
+        cube.cells = cells
+        return cube
+    
+    def updated(self, removed, added):
+        """Nouveau cube après retrait puis ajout de lignes, sans reparcourir la table
+        
+        Retourne None si les lignes ajoutées font apparaître une nouvelle catégorie :
+        le cube doit alors être reconstruit.
+        """
+        cube = copy.copy(self)
+        cube.cells = {measure: cells.copy() for measure, cells in self.cells.items()}
+        for frame, sign in ((removed, -1), (added, 1)):
+            codes = [pd.Categorical(frame[dim], categories=cats).codes
+                     for dim, cats in zip(self.dimensions, self.categories)]
+            valid = np.logical_and.reduce([c >= 0 for c in codes])
+            if (~valid & frame[list(self.dimensions)].notna().all(axis=1).to_numpy()).any():
+                return None
+            index = tuple(c[valid] for c in codes)
+            np.add.at(cube.cells['count'], index, sign)
+            for measure in self.measures:
+                np.add.at(cube.cells[measure], index, sign * frame[measure].to_numpy()[valid])
+        return cube
+    
+    def query(self, by=None, **selections):
+        """Sommes par valeur de la dimension `by` (ou totales), pour les valeurs sélectionnées
+        
+        Une sélection vide ou absente vaut 'toutes les valeurs'.
+        """
+        index = []
+        for dim, positions in zip(self.dimensions, self.positions):
+            values = selections.get(dim)
+            if values:
+                index.append(np.array([positions[v] for v in values if v in positions], dtype='int64'))
+            else:
+                index.append(slice(None))
+        
+        result = {}
+        for measure, cells in self.cells.items():
+            for axis, idx in enumerate(index):
+                if not isinstance(idx, slice):
+                    cells = np.take(cells, idx, axis=axis)
+            if by is None:
+                result[measure] = cells.sum()
+            else:
+                axis = self.dimensions.index(by)
+                result[measure] = cells.sum(axis=tuple(a for a in range(cells.ndim) if a != axis))
+        
+        if by is None:
+            return result
+        
+        axis = self.dimensions.index(by)
+        labels = self.categories[axis]
+        if not isinstance(index[axis], slice):
+            labels = [labels[i] for i in index[axis]]
+        agg = pd.DataFrame({by: labels, **result})
+        # Comme un groupby(observed=True) : seules les cellules non vides sont conservées
+        return agg[agg['count'] > 0].reset_index(drop=True)
+
+def escape_column(values):
+    """Échappement HTML vectorisé d'une colonne de texte"""
+    values = values.astype(str)
+    for char, entity in (('&', '&amp;'), ('<', '&lt;'), ('>', '&gt;'), ('"', '&quot;'), ("'", '&#x27;')):
+        values = values.str.replace(char, entity, regex=False)
+    return values
+
+def bailleurs_comparison(bailleurs):
+    """Lignes HTML de la comparaison des bailleurs, formatées colonne par colonne
+    
+    Retourne les colonnes de filtre et de tri et, dans `html`, la ligne de tableau
+    de chaque bailleur ; l'affichage ne fait ensuite que sélectionner et joindre.
+    """
+    text = {col: escape_column(bailleurs[col]) for col in
+            ('nom', 'description', 'siege', 'annee_creation', 'logements_construction_an', 'chiffre_affaires',
+             'investissement_annuel', 'performance_gestion', 'taux_impayes', 'taux_rotation')}
+    parc = bailleurs['parc_total'].map('{:,}'.format)
+    css_class = bailleurs['performance_gestion'].map(PERFORMANCE_CLASSES).fillna('performance-low')
+    html_rows = (
+        "<tr><td><strong>" + text['nom'] + "</strong><br><em>" + text['description'] + "</em><br>Siège: "
+        + text['siege'] + " • Création: " + text['annee_creation']
+        + "</td><td><strong>" + parc + "</strong> logements<br>Construction: " + text['logements_construction_an']
+        + "/an</td><td><strong>" + text['chiffre_affaires'] + " M€</strong><br>Investissement: "
+        + text['investissement_annuel'] + " M€</td><td><strong>" + text['performance_gestion']
+        + "</strong><br>Impayés: " + text['taux_impayes'] + "%</td><td><div class='" + css_class
+        + "'>Performance: " + text['performance_gestion'] + "</div>Rotation: " + text['taux_rotation'] + "%</td></tr>"
+    )
+    return pd.DataFrame({
+        'type': bailleurs['type'],
+        'performance_gestion': bailleurs['performance_gestion'],
+        'parc_total': bailleurs['parc_total'],
+        'chiffre_affaires': bailleurs['chiffre_affaires'],
+        'investissement_annuel': bailleurs['investissement_annuel'],
+        'performance_order': bailleurs['performance_gestion'].map(PERFORMANCE_ORDER),
+        'html': html_rows
+    })
+
+def match_offer_demand(offre, vacants, liberations, demande, scenarios):
+    """Appariement offre/demande de chaque cellule (zone × type de logement) pour chaque scénario
+    
+    Les tableaux d'entrée ont une ligne par zone et une colonne par type : parc,
+    logements vacants (attribuables immédiatement), libérations annuelles par
+    rotation et demande. `scenarios` a une ligne par scénario (voir Scenario).
+    Retourne des tableaux (scénario, zone, type) :
+    - attribuables : vacants et logements libérés ou livrés dans l'année ;
+    - couverture : attribuables / demande (inf sans demande) ;
+    - attente_mois : délai d'écoulement de la file au rythme des libérations et livraisons ;
+    - deficit : demande non satisfaite à un an.
+    """
+    scenarios = np.asarray(scenarios, dtype='float64')
+    croissance, rotation, construction = (scenarios[:, i, None, None] for i in range(3))
+    demande = demande * (1 + croissance)
+    flux = liberations * rotation + offre * construction
+    attribuables = vacants + flux
+    file = np.maximum(demande - vacants, 0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        couverture = np.where(demande > 0, attribuables / demande, np.inf)
+        attente = np.where(file > 0, 12 * file / flux, 0.0)
+    return {
+        'demande': demande,
+        'attribuables': attribuables,
+        'couverture': couverture,
+        'attente_mois': attente,
+        'deficit': np.maximum(demande - attribuables, 0)
+    }
+
+class OfferDemandMatcher:
+    """Offre et demande de logement social par commune et par type de logement
+    
+    Le parc de chaque bailleur, connu par type, est réparti entre les communes au
+    prorata des logements de ses projets situés dans chacune (à défaut dans sa
+    commune de siège, sinon uniformément). La demande de chaque commune est
+    répartie par type selon la part des demandeurs sous chaque plafond de
+    ressources, les revenus suivant une loi log-logistique centrée sur le revenu
+    moyen, après la part des publics spécifiques. Les tableaux sont construits une
+    fois par version des données ; les scénarios sont évalués ensemble par
+    match_offer_demand.
+    """
+    
+    def __init__(self, dataset, communes_projets):
+        parc = dataset['parc_data']
+        projets = dataset['projets_data']
+        bailleurs = pd.DataFrame(list(dataset['bailleurs_data']))
+        demande = dataset['demande_data']
+        self.communes = pd.Index(demande['commune'].astype(str))
+        self.types = list(parc['type_logement'].cat.categories)
+        noms = parc['bailleur'].cat.categories
+        n_bailleurs, n_communes, n_types = len(noms), len(self.communes), len(self.types)
+        
+        # Parc, vacants et libérations annuelles par bailleur et par type
+        b, t = parc['bailleur'].cat.codes.to_numpy(), parc['type_logement'].cat.codes.to_numpy()
+        valid = (b >= 0) & (t >= 0)
+        cells = np.ravel_multi_index((b[valid], t[valid]), (n_bailleurs, n_types))
+        nombre = parc['nombre_logements'].to_numpy(dtype='float64')[valid]
+        size = n_bailleurs * n_types
+        stock = np.bincount(cells, weights=nombre, minlength=size).reshape(n_bailleurs, n_types)
+        vacants = np.bincount(cells, weights=nombre * parc['taux_vacance'].to_numpy(dtype='float64')[valid] / 100,
+                              minlength=size).reshape(n_bailleurs, n_types)
+        rotation = bailleurs.set_index('nom')['taux_rotation'].reindex(noms).fillna(0).to_numpy() / 100
+        
+        # Implantation : part du parc de chaque bailleur dans chaque commune
+        b = pd.Categorical(projets['bailleur'], categories=noms).codes
+        c = self.communes.get_indexer(np.asarray(communes_projets, dtype=object))
+        valid = (b >= 0) & (c >= 0)
+        implantation = np.bincount(np.ravel_multi_index((b[valid], c[valid]), (n_bailleurs, n_communes)),
+                                   weights=projets['logements_prevus'].to_numpy(dtype='float64')[valid],
+                                   minlength=n_bailleurs * n_communes).reshape(n_bailleurs, n_communes)
+        siege = self.communes.get_indexer(bailleurs.set_index('nom')['siege'].reindex(noms).astype(str))
+        sans_projet = implantation.sum(axis=1) == 0
+        implantation[sans_projet & (siege >= 0), siege[sans_projet & (siege >= 0)]] = 1
+        implantation[implantation.sum(axis=1) == 0] = 1
+        implantation /= implantation.sum(axis=1, keepdims=True)
+        
+        self.offre = implantation.T @ stock
+        self.vacants = implantation.T @ vacants
+        self.liberations = implantation.T @ (stock * rotation[:, None])
+        self.demande = demande['demande_totale'].to_numpy(dtype='float64')[:, None] * self.demand_mix(
+            demande['revenu_moyen_demandeur'].to_numpy(dtype='float64'))
+        self._results = None
+    
+    def demand_mix(self, revenus):
+        """Part de la demande de chaque commune relevant de chaque type de logement"""
+        mix = np.zeros((len(revenus), len(self.types)))
+        specifique = 0.0
+        for type_logement, part in DEMANDE_SPECIFIQUE.items():
+            if type_logement in self.types:
+                mix[:, self.types.index(type_logement)] = part
+                specifique += part
+        
+        # Part des demandeurs sous chaque plafond (fonction de répartition log-logistique)
+        plafonds = np.array(list(PLAFONDS_RESSOURCES.values()), dtype='float64')
+        sous_plafond = 1 / (1 + np.exp(-(np.log(plafonds)[None, :] - np.log(revenus)[:, None]) / DISPERSION_REVENUS))
+        parts = np.diff(sous_plafond, prepend=0, append=1, axis=1) * (1 - specifique)
+        for type_logement, part in zip([*PLAFONDS_RESSOURCES, 'Accession'], parts.T):
+            if type_logement in self.types:
+                mix[:, self.types.index(type_logement)] += part
+        return mix
+    
+    def run(self, scenarios=SCENARIOS_ADEQUATION):
+        """Résultats de tous les scénarios, calculés une fois pour les scénarios par défaut"""
+        if scenarios is SCENARIOS_ADEQUATION and self._results is not None:
+            return self._results
+        results = match_offer_demand(self.offre, self.vacants, self.liberations, self.demande,
+                                     list(scenarios.values()))
+        if scenarios is SCENARIOS_ADEQUATION:
+            self._results = results
+        return results
+    
+    def frame(self, scenario, scenarios=SCENARIOS_ADEQUATION):
+        """Résultats d'un scénario, une ligne par commune et type de logement"""
+        results = self.run(scenarios)
+        s = list(scenarios).index(scenario)
+        n_communes, n_types = self.offre.shape
+        return pd.DataFrame({
+            'commune': np.repeat(self.communes.to_numpy(), n_types),
+            'type_logement': np.tile(self.types, n_communes),
+            'offre': self.offre.ravel(),
+            **{name: values[s].ravel() for name, values in results.items()}
+        })
+
+class ProjectionEngine:
+    """Projections Monte Carlo des bailleurs sur 2025-2040, calculées en tâche de fond
+    
+    Un thread répartit les lots de scénarios entre les processus d'un pool (voir
+    projections.simulate_batch) et fusionne leurs centiles à mesure qu'ils arrivent :
+    le graphique s'affiche dès le premier lot puis s'affine jusqu'au nombre de
+    scénarios demandé. Seuls les centiles de chaque lot sont renvoyés, jamais les
+    trajectoires ; les centiles fusionnés sont la moyenne des centiles des lots
+    pondérée par leur taille, approximation d'autant plus proche des centiles
+    exacts que les lots sont grands.
+    """
+    
+    def __init__(self, dataset, scenarios=PROJECTION_SCENARIOS, workers=PROJECTION_WORKERS):
+        bailleurs = pd.DataFrame(list(dataset['bailleurs_data']))
+        self.bailleurs = list(bailleurs['nom'])
+        self.base = {name: bailleurs[column].to_numpy(dtype='float64') for name, column in zip(
+            INDICATEURS, ('parc_total', 'logements_construction_an', 'taux_impayes', 'investissement_annuel'))}
+        self.seed = dataset['seed']
+        self.scenarios = scenarios
+        self.workers = workers
+        self.lot = max(1, min(PROJECTION_LOT, PROJECTION_LOT_VALEURS // (len(self.bailleurs) * len(PROJECTION_ANNEES))))
+        self.done = 0
+        self.last_error = None
+        self._sum = None
+        self._thread = None
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Démarre le calcul s'il n'est ni en cours ni terminé"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name='bailleurs-projections', daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        """Interrompt le calcul : les lots en attente sont annulés, le pool s'arrête après les lots en cours"""
+        self._stop.set()
+        with self._lock:
+            executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def finished(self):
+        return self.done >= self.scenarios or self.last_error is not None
+    
+    def run(self):
+        lots = [min(self.lot, self.scenarios - start) for start in range(0, self.scenarios, self.lot)]
+        args = (self.base, HYPOTHESES_PROJECTION, len(PROJECTION_ANNEES), self.seed)
+        try:
+            if self.workers <= 1:
+                for lot, taille in enumerate(lots):
+                    if self._stop.is_set():
+                        return
+                    self.merge(taille, simulate_batch(*args, lot, taille, PROJECTION_CENTILES))
+                return
+            # Processus lancés par spawn : le serveur Streamlit a des threads, un fork n'est pas sûr
+            with ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+                with self._lock:
+                    self._executor = executor
+                if self._stop.is_set():
+                    return
+                futures = {executor.submit(simulate_batch, *args, lot, taille, PROJECTION_CENTILES): taille
+                           for lot, taille in enumerate(lots)}
+                for future in as_completed(futures):
+                    if self._stop.is_set():
+                        return
+                    self.merge(futures[future], future.result())
+        except Exception as exc:
+            # Lots annulés par stop() : ce n'est pas un échec du calcul
+            if not self._stop.is_set():
+                self.last_error = exc
+        finally:
+            with self._lock:
+                self._executor = None
+    
+    def merge(self, taille, centiles):
+        with self._lock:
+            self._sum = centiles * taille if self._sum is None else self._sum + centiles * taille
+            self.done += taille
+    
+    def bands(self):
+        """Centiles (indicateur, centile, bailleur, année) des scénarios déjà simulés et leur nombre
+        
+        Le dernier bailleur est l'ensemble du parc ; None tant qu'aucun lot n'est terminé.
+        """
+        with self._lock:
+            if not self.done:
+                return None, 0
+            return self._sum / self.done, self.done
+
+def projection_figure(centiles, indicateur, bailleur, perimetre):
+    """Bandes de centiles d'un indicateur projeté : 5-95 %, 25-75 % et médiane"""
+    name, unite = PROJECTION_INDICATEURS[indicateur]
+    values = centiles[INDICATEURS.index(name), :, bailleur]
+    fig = go.Figure()
+    for (bas, haut), opacity, label in (((0, 4), 0.2, '5 %-95 %'), ((1, 3), 0.4, '25 %-75 %')):
+        fig.add_trace(go.Scatter(x=PROJECTION_ANNEES, y=values[haut], mode='lines', line_width=0,
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=PROJECTION_ANNEES, y=values[bas], mode='lines', line_width=0, fill='tonexty',
+                                 fillcolor=f'rgba(2, 136, 209, {opacity})', name=label))
+    fig.add_trace(go.Scatter(x=PROJECTION_ANNEES, y=values[2], mode='lines+markers', line_color='#0288D1',
+                             name='Médiane'))
+    return fig.update_layout(title=f'{indicateur} projeté - {perimetre}', xaxis_title='Année', yaxis_title=unite)
+
+class AggregateCube:
+    """Agrégats du dashboard matérialisés une fois par version des données
+    
+    Les KPI et les graphiques agrégés sont calculés en sommant des cellules
+    plutôt qu'en reparcourant les lignes des tables. Après une ingestion, les cubes
+    des tables inchangées sont repris de la version précédente (`previous`) et ceux
+    des tables modifiées sont mis à jour à partir des lignes retirées et écrites (`deltas`).
+    """
+    
+    def __init__(self, dataset, previous=None, deltas=None):
+        deltas = deltas or {}
+        bailleurs = pd.DataFrame(list(dataset['bailleurs_data']))
+        self.totals = {
+            'parc_total': int(bailleurs['parc_total'].sum()),
+            'logements_construction_an': int(bailleurs['logements_construction_an'].sum()),
+            'investissement_annuel': float(bailleurs['investissement_annuel'].sum()),
+            'demande_totale': int(dataset['demande_data']['demande_totale'].sum())
+        }
+        self.parc = self.derive(dataset['parc_data'], ('bailleur', 'type_logement'),
+                                ('nombre_logements', 'loyer_moyen', 'taux_vacance'),
+                                previous and previous.parc, deltas.get('parc'))
+        self.projets = self.derive(dataset['projets_data'], ('bailleur', 'micro_region', 'type_projet', 'statut'),
+                                   ('logements_prevus', 'investissement'),
+                                   previous and previous.projets, deltas.get('projets'))
+        if previous is None or 'bailleurs' in deltas:
+            self.comparaison = bailleurs_comparison(bailleurs)
+        else:
+            self.comparaison = previous.comparaison
+        # Projections reprises de la version précédente tant que le référentiel des bailleurs ne change pas
+        if previous is not None and 'bailleurs' not in deltas:
+            self._projections = getattr(previous, '_projections', None)
+        if previous is None or 'demande' in deltas:
+            self.communes = dataset['demande_data'].groupby('commune', sort=False)[['demande_totale', 'demande_urgence']].sum()
+        else:
+            self.communes = previous.communes
+    
+    def matcher(self, dataset, communes_projets):
+        """Moteur d'adéquation offre/demande de cette version des données, construit au premier appel"""
+        if getattr(self, '_matcher', None) is None:
+            self._matcher = OfferDemandMatcher(dataset, communes_projets)
+        return self._matcher
+    
+    def projections(self, dataset):
+        """Moteur de projections de cette version des données, créé au premier appel"""
+        if getattr(self, '_projections', None) is None:
+            self._projections = ProjectionEngine(dataset)
+        return self._projections
+    
+    def write(self, target):
+        """Écrit les agrégats dans un répertoire d'instantané ; retourne leur description et les empreintes des fichiers"""
+        digests = {
+            'communes.arrow': write_arrow(self.communes, os.path.join(target, 'communes.arrow'), preserve_index=True),
+            'comparaison.arrow': write_arrow(self.comparaison, os.path.join(target, 'comparaison.arrow'))
+        }
+        cubes = {}
+        for name in ('parc', 'projets'):
+            cube = getattr(self, name)
+            cubes[name] = {
+                'dimensions': list(cube.dimensions),
+                'measures': list(cube.measures),
+                'categories': cube.categories,
+                'shape': list(cube.cells['count'].shape)
+            }
+            cells = pd.DataFrame({measure: cells.ravel() for measure, cells in cube.cells.items()})
+            digests[f"cube_{name}.arrow"] = write_arrow(cells, os.path.join(target, f"cube_{name}.arrow"))
+        return {'totals': self.totals, 'cubes': cubes}, digests
+    
+    @classmethod
+    def read(cls, target, description):
+        """Agrégats projetés en mémoire depuis un répertoire d'instantané"""
+        aggregates = cls.__new__(cls)
+        aggregates.totals = description['totals']
+        aggregates.communes = read_arrow(os.path.join(target, 'communes.arrow'))
+        aggregates.comparaison = read_arrow(os.path.join(target, 'comparaison.arrow'))
+        for name, cube in description['cubes'].items():
+            cells = read_arrow(os.path.join(target, f"cube_{name}.arrow"))
+            setattr(aggregates, name, Cube.restored(
+                cube['dimensions'], cube['measures'], cube['categories'],
+                {measure: cells[measure].to_numpy().reshape(cube['shape']) for measure in cells.columns}))
+        return aggregates
+    
+    @staticmethod
+    def derive(frame, dimensions, measures, previous=None, deltas=None):
+        """Cube d'une table : repris, mis à jour par différences ou reconstruit"""
+        cube = previous
+        for removed, added in (deltas or ()) if cube is not None else ():
+            cube = cube.updated(removed, added)
+            if cube is None:
+                break
+        return cube if cube is not None else Cube(frame, dimensions, measures)
+
+def key_positions(frame, rows, keys):
+    """Position dans la table de la ligne de même clé que chaque ligne entrante (-1 si absente)
+    
+    Un filtre isin par colonne de clé réduit d'abord la table aux lignes candidates :
+    l'index de correspondance n'est construit que sur celles-ci, pas sur toute la table.
+    """
+    def key_index(df):
+        return pd.Index(df[keys[0]]) if len(keys) == 1 else pd.MultiIndex.from_frame(df[list(keys)])
+    
+    candidates = np.flatnonzero(np.logical_and.reduce([frame[key].isin(rows[key]).to_numpy() for key in keys]))
+    existing = key_index(frame[list(keys)].take(candidates))
+    if not existing.is_unique:
+        raise ValueError(f"La clé {keys} n'identifie pas les lignes de la table de façon unique")
+    found = existing.get_indexer(key_index(rows))
+    # Seules les lignes trouvées sont lues dans les candidats, qui peuvent être vides
+    positions = np.full(len(found), -1, dtype='int64')
+    positions[found >= 0] = candidates[found[found >= 0]]
+    return positions
+
+def upsert_frame(frame, rows, keys, append_only=False, optional=()):
+    """Applique des lignes à une table : mise à jour des lignes de même clé, ajout des autres
+    
+    La table d'origine n'est pas modifiée. Retourne la nouvelle table, les anciennes
+    valeurs des lignes remplacées et les positions des lignes écrites.
+    """
+    unknown = [col for col in rows.columns if col not in frame.columns]
+    if unknown:
+        raise ValueError(f"Colonnes inconnues: {unknown}")
+    if not append_only:
+        missing_keys = [key for key in keys if key not in rows.columns]
+        if missing_keys:
+            raise ValueError(f"Colonnes de clé manquantes: {missing_keys}")
+        rows = rows.drop_duplicates(list(keys), keep='last')
+    
+    # Types de la table ; les nouvelles catégories sont ajoutées en fin de liste,
+    # sans changer les codes existants
+    frame = frame.copy(deep=False)
+    rows = rows.reset_index(drop=True)
+    for col in rows.columns:
+        dtype = frame[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            new = pd.Index(rows[col].dropna().unique()).difference(dtype.categories)
+            if len(new):
+                frame[col] = frame[col].cat.add_categories(new)
+            rows[col] = pd.Categorical(rows[col], categories=frame[col].cat.categories)
+        else:
+            rows[col] = rows[col].astype(dtype)
+    
+    positions = np.full(len(rows), -1, dtype='int64') if append_only else key_positions(frame, rows, keys)
+    matched = positions >= 0
+    
+    removed = frame.take(positions[matched])
+    for col in rows.columns.difference(keys) if matched.any() else ():
+        values = frame[col].copy()
+        values.iloc[positions[matched]] = rows[col].array[matched]
+        frame[col] = values
+    
+    inserted = rows[~matched]
+    if len(inserted):
+        absent = [col for col in frame.columns if col not in inserted.columns and col not in optional]
+        if absent:
+            raise ValueError(f"Colonnes manquantes pour les nouvelles lignes: {absent}")
+        frame = pd.concat([frame, inserted.reindex(columns=frame.columns)], ignore_index=True)
+    written = np.concatenate([positions[matched], np.arange(len(frame) - len(inserted), len(frame))])
+    return frame, removed, written
+
+def ingest_dataset(dataset, appends=None, upserts=None):
+    """Nouvelle version d'un jeu de données après ajouts et mises à jour incrémentales
+    
+    `appends` et `upserts` associent un nom de table (bailleurs, parc, historique,
+    projets, demande, financement) à un DataFrame de lignes. Les ajouts sont
+    concaténés ; les upserts mettent à jour les colonnes fournies des lignes de même
+    clé (TABLE_KEYS) et ajoutent les autres. Seules les tables touchées sont recopiées
+    et changent de version. Retourne le jeu de données et, par table modifiée, les
+    couples (lignes retirées, lignes écrites) qui permettent de mettre à jour les agrégats.
+    """
+    names = {table: name for name, table in DATASET_FRAMES_TABLES}
+    tables = {}
+    deltas = {}
+    digests = []
+    changes = [(table, rows, True) for table, rows in (appends or {}).items()]
+    changes += [(table, rows, False) for table, rows in (upserts or {}).items()]
+    
+    for table, rows, append_only in changes:
+        if table not in TABLE_KEYS:
+            raise ValueError(f"Table inconnue: '{table}'")
+        if rows is None or rows.empty:
+            continue
+        if table not in tables:
+            tables[table] = (pd.DataFrame(list(dataset['bailleurs_data'])) if table == 'bailleurs'
+                             else dataset[names[table]])
+        frame, removed, written = upsert_frame(tables[table], rows, TABLE_KEYS[table], append_only,
+                                               OPTIONAL_COLUMNS.get(table, ()))
+        if table == 'projets':
+            frame = locate_projets(frame, dataset['seed'])
+        tables[table] = frame
+        deltas.setdefault(table, []).append((removed, frame.take(written)))
+        digests.append((table, append_only, int(pd.util.hash_pandas_object(rows, index=False).sum())))
+    
+    if not deltas:
+        return dataset, {}
+    
+    # Version dérivée du contenu des mises à jour : identique dans tous les processus
+    # qui appliquent les mêmes mises à jour à la même version
+    version = f"{dataset['version'].partition('+')[0]}+{stable_digest(dataset['version'], *digests):016x}"
+    updated = dict(dataset)
+    for table, frame in tables.items():
+        if table == 'bailleurs':
+            updated['bailleurs_data'] = tuple(MappingProxyType(b) for b in frame.to_dict('records'))
+        else:
+            updated[names[table]] = frame
+    updated['versions'] = MappingProxyType({
+        table: f"{table}@{version}" if table in deltas else current
+        for table, current in dataset['versions'].items()
+    })
+    updated['version'] = version
+    updated['built_at'] = datetime.now()
+    return MappingProxyType(updated), deltas
+
+# Jeu de données et structures dérivées, remplacés ensemble à chaque nouvelle version
+DataSnapshot = namedtuple('DataSnapshot', ['dataset', 'filter_engine', 'cube'])
+
+class DataStore:
+    """Version courante du jeu de données d'une source, partagée par les sessions
+    
+    Une ingestion construit la version suivante par incréments (tables, index,
+    masques et agrégats des seules tables touchées), la publie d'un bloc, puis retire
+    des caches les figures et cartes qui dépendaient des tables modifiées. Une session
+    en cours conserve la version lue au début de son exécution.
+    """
+    
+    def __init__(self, dataset, cube=None):
+        self._lock = threading.Lock()
+        self.snapshot = DataSnapshot(dataset, FilterEngine(dataset), cube or AggregateCube(dataset))
+    
+    def current(self):
+        """Version courante : jeu de données, moteur de filtres et agrégats"""
+        return self.snapshot
+    
+    def ingest(self, appends=None, upserts=None):
+        """Applique des ajouts et des mises à jour (voir ingest_dataset) ; retourne la nouvelle version"""
+        with self._lock:
+            previous = self.snapshot
+            dataset, deltas = ingest_dataset(previous.dataset, appends, upserts)
+            if not deltas:
+                return previous
+            self.snapshot = DataSnapshot(dataset,
+                                         FilterEngine(dataset, previous.filter_engine, deltas),
+                                         AggregateCube(dataset, previous.cube, deltas))
         
-        return pd.DataFrame(data)
+        self.retire(previous.cube, self.snapshot.cube)
+        self.discard_figures({previous.dataset['versions'][table] for table in deltas} | {previous.dataset['version']})
+        return self.snapshot
+    
+    def replace(self, dataset, cube=None):
+        """Publie un jeu de données entièrement reconstruit ; retourne la nouvelle version"""
+        # Structures dérivées construites avant la bascule : les sessions ne les attendent pas
+        snapshot = DataSnapshot(dataset, FilterEngine(dataset), cube or AggregateCube(dataset))
+        with self._lock:
+            previous = self.snapshot
+            self.snapshot = snapshot
+        self.retire(previous.cube, snapshot.cube)
+        self.discard_figures(set(previous.dataset['versions'].values()) | {previous.dataset['version']})
+        return snapshot
+    
+    def close(self):
+        """Arrête les calculs en tâche de fond de la version courante (store retiré du cache)"""
+        engine = getattr(self.snapshot.cube, '_projections', None)
+        if engine is not None:
+            engine.stop()
+    
+    @staticmethod
+    def retire(previous, cube):
+        """Arrête les projections d'une version remplacée qui ne sont pas reprises par la nouvelle"""
+        engine = getattr(previous, '_projections', None)
+        if engine is not None and engine is not getattr(cube, '_projections', None):
+            engine.stop()
+    
+    @staticmethod
+    def discard_figures(stale):
+        """Retire des caches les figures et cartes construites sur des versions périmées"""
+        for cache in (get_figure_cache(), get_map_cache()):
+            cache.discard(lambda key: not stale.isdisjoint(key[1]))
+
+class RefreshScheduler:
+    """Surveille la source des données en tâche de fond et publie ses nouvelles versions
+    
+    Un seul thread par processus et par source compare périodiquement l'empreinte
+    de la source à la version publiée, et ne reconstruit le jeu de données que si
+    elle a changé. Les sessions ne déclenchent jamais de rechargement : elles
+    comparent seulement leur version à celle du store.
+    """
+    
+    def __init__(self, source_uri, seed, interval=REFRESH_INTERVAL):
+        self.source_uri = source_uri
+        self.seed = seed
+        self.interval = interval
+        self.last_check = None
+        self.last_error = None
+        self.refreshes = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+    
+    def start(self):
+        """Démarre la surveillance si elle n'est pas déjà en cours"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self.run, name='bailleurs-refresh', daemon=True)
+                self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+    
+    def poll(self):
+        """Recharge la source si son empreinte a changé ; retourne True si une version a été publiée"""
+        try:
+            store = get_data_store(self.source_uri, self.seed)
+            version = source_version(self.source_uri, self.seed)
+            self.last_check = datetime.now()
+            if version == store.current().dataset['version'].partition('+')[0]:
+                return False
+            snapshot = store.replace(read_dataset(self.source_uri, self.seed))
+            if SNAPSHOT_DIR:
+                write_snapshot(snapshot.dataset, snapshot.cube, self.source_uri, self.seed)
+            self.refreshes += 1
+            self.last_error = None
+            return True
+        except Exception as exc:
+            # Une source momentanément illisible n'interrompt pas la surveillance
+            self.last_error = exc
+            return False
+
+@st.cache_resource
+def get_refresh_scheduler(source_uri, seed):
+    """Surveillance de la source, partagée par toutes les sessions du processus"""
+    return RefreshScheduler(source_uri, seed)
+
+def write_frame(frame, sink, fmt, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Écrit une table en CSV ou en Parquet, par tranches de lignes
+    
+    Chaque tranche est convertie en lot Arrow depuis les colonnes de la table puis
+    écrite : ni copie complète de la table, ni chaîne du fichier entier en mémoire.
+    Les colonnes catégorielles sont écrites par valeur en CSV, en dictionnaire en Parquet.
+    """
+    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+    if fmt == 'csv':
+        # Valeurs plutôt que dictionnaires, dates à la seconde
+        target = pa.schema([
+            field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type)
+            else field.with_type(pa.timestamp('s', field.type.tz)) if pa.types.is_timestamp(field.type)
+            else field
+            for field in schema
+        ])
+        writer = pyarrow.csv.CSVWriter(sink, target)
+    else:
+        target = schema
+        writer = pq.ParquetWriter(sink, schema)
+    with writer:
+        for start in range(0, len(frame), chunk_rows):
+            batch = pa.RecordBatch.from_pandas(frame.iloc[start:start + chunk_rows], schema=schema,
+                                               preserve_index=False)
+            writer.write_batch(batch.cast(target, safe=False) if target is not schema else batch)
+
+def export_frame(frame, fmt):
+    """Contenu du fichier de téléchargement d'une table
+    
+    La table est écrite par tranches dans un fichier temporaire anonyme, sans copie
+    de la table, puis le fichier terminé est relu en entier et retourné en mémoire :
+    Streamlit le conserve ainsi (gestionnaire des fichiers média) le temps de le
+    servir. Un téléchargement demande donc au worker autant de mémoire que la taille
+    du fichier.
+    """
+    with tempfile.TemporaryFile() as sink:
+        write_frame(frame, sink, fmt)
+        sink.seek(0)
+        return sink.read()
+
+def file_digest(path):
+    """Empreinte du contenu d'un fichier"""
+    with open(path, 'rb') as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+def write_arrow(frame, path, preserve_index=False):
+    """Écrit une table en fichier Arrow IPC non compressé, remplacé atomiquement ; retourne son empreinte"""
+    table = pa.Table.from_pandas(frame, preserve_index=preserve_index)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(temporary, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(temporary, path)
+    return file_digest(path)
+
+def read_arrow(path):
+    """Table projetée en mémoire depuis un fichier Arrow IPC"""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    # Les colonnes string[pyarrow] restent en tampons Arrow au lieu d'objets Python
+    strings = {pa.large_string(): pd.StringDtype('pyarrow')}
+    return table.to_pandas(split_blocks=True, types_mapper=strings.get)
+
+def snapshot_hash(version):
+    """Empreinte attendue d'un instantané : version des données, format et schéma des tables"""
+    return f"{stable_digest(SNAPSHOT_FORMAT, version, json.dumps(TABLE_SCHEMAS, sort_keys=True)):016x}"
+
+def materialize_dataset(dataset, directory, keep=2, cube=None):
+    """Écrit un jeu de données en fichiers Arrow IPC partageables entre processus
+    
+    Les tables sont écrites sans compression dans un sous-répertoire propre à la
+    version, puis le manifeste est remplacé atomiquement : un worker lit toujours
+    une version complète. Seules les `keep` dernières versions sont conservées.
+    Avec `cube`, les agrégats sont écrits avec les tables. Le manifeste porte
+    l'empreinte de chaque fichier et celle de la version (voir open_snapshot).
+    """
+    target = os.path.join(directory, dataset['version'])
+    os.makedirs(target, exist_ok=True)
+    tables = dict(DATASET_FRAMES_TABLES)
+    frames = {name: dataset[name] for name in DATASET_FRAMES}
+    frames['bailleurs_data'] = pd.DataFrame(list(dataset['bailleurs_data']))
+    files = {}
+    for name, frame in frames.items():
+        filename = f"{tables.get(name, 'bailleurs')}.arrow"
+        files[filename] = write_arrow(frame, os.path.join(target, filename))
+    
+    manifest = {
+        'version': dataset['version'],
+        'hash': snapshot_hash(dataset['version']),
+        'built_at': dataset['built_at'].isoformat(),
+        'versions': dict(dataset['versions']),
+        'seed': dataset['seed'],
+        'kpi_variations': dict(dataset['kpi_variations'])
+    }
+    if cube is not None:
+        manifest['aggregates'], digests = cube.write(target)
+        files.update(digests)
+    manifest['files'] = files
+    temporary = os.path.join(directory, f"manifest.json.{os.getpid()}.tmp")
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temporary, os.path.join(directory, 'manifest.json'))
+    
+    # Les versions précédentes restent lisibles le temps que les workers basculent
+    versions = sorted((entry for entry in os.scandir(directory) if entry.is_dir()),
+                      key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in versions[keep:]:
+        for name in os.listdir(entry.path):
+            os.remove(os.path.join(entry.path, name))
+        os.rmdir(entry.path)
+    return target
+
+def attach_dataset(directory):
+    """Jeu de données en lecture seule projeté en mémoire depuis les fichiers d'un chargeur
+    
+    Les fichiers Arrow sont ouverts par memory-map : les colonnes numériques, dates
+    et chaînes Arrow ne sont pas copiées, et les pages sont partagées par tous les
+    workers de la machine via le cache du système.
+    """
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    target = os.path.join(directory, manifest['version'])
+    tables = dict(DATASET_FRAMES_TABLES)
+    
+    def read(name):
+        return read_arrow(os.path.join(target, f"{tables.get(name, 'bailleurs')}.arrow"))
+    
+    dataset = {name: read(name) for name in DATASET_FRAMES}
+    dataset['bailleurs_data'] = tuple(MappingProxyType(b) for b in read('bailleurs_data').to_dict('records'))
+    dataset['kpi_variations'] = MappingProxyType(manifest['kpi_variations'])
+    dataset['built_at'] = datetime.fromisoformat(manifest['built_at'])
+    dataset['version'] = manifest['version']
+    dataset['versions'] = MappingProxyType(manifest['versions'])
+    dataset['seed'] = manifest['seed']
+    return MappingProxyType(dataset)
+
+def snapshot_directory(source_uri, seed, directory=SNAPSHOT_DIR):
+    """Répertoire de l'instantané d'une source : un sous-répertoire par source et graine"""
+    return os.path.join(directory, f"{stable_digest(source_uri, seed):016x}")
+
+def open_snapshot(source_uri, seed, directory=SNAPSHOT_DIR):
+    """Jeu de données et agrégats projetés en mémoire depuis l'instantané d'une source
+    
+    L'instantané n'est utilisé que si son empreinte correspond à l'état actuel de la
+    source (version, format, schéma) et que chaque fichier a l'empreinte notée dans
+    le manifeste ; sinon ValueError.
+    """
+    directory = snapshot_directory(source_uri, seed, directory)
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('hash') != snapshot_hash(source_version(source_uri, seed)) or 'aggregates' not in manifest:
+        raise ValueError(f"Instantané périmé: {directory}")
+    target = os.path.join(directory, manifest['version'])
+    for filename, digest in manifest['files'].items():
+        if file_digest(os.path.join(target, filename)) != digest:
+            raise ValueError(f"Fichier d'instantané altéré: {filename}")
+    return attach_dataset(directory), AggregateCube.read(target, manifest['aggregates'])
+
+def write_snapshot(dataset, cube, source_uri, seed, directory=SNAPSHOT_DIR):
+    """Écrit l'instantané d'une source ; un échec d'écriture n'empêche pas le dashboard de fonctionner"""
+    try:
+        return materialize_dataset(dataset, snapshot_directory(source_uri, seed, directory), keep=1, cube=cube)
+    except OSError as exc:
+        warnings.warn(f"Instantané non écrit: {exc}")
+
+def load_snapshot(source_uri, seed, directory=SNAPSHOT_DIR):
+    """Jeu de données et agrégats d'une source : depuis son instantané s'il est valide, sinon reconstruits"""
+    try:
+        return open_snapshot(source_uri, seed, directory)
+    except (OSError, ValueError, KeyError, pa.ArrowInvalid):
+        pass
+    dataset = read_dataset(source_uri, seed)
+    cube = AggregateCube(dataset)
+    write_snapshot(dataset, cube, source_uri, seed, directory)
+    return dataset, cube
+
+def read_dataset(source_uri, seed):
+    """Construit le jeu de données d'une source (sans cache)
+    
+    Avec une URI 'shared:<répertoire>', le jeu de données n'est pas construit mais
+    projeté en mémoire depuis les fichiers écrits par le chargeur (loader.py).
+    """
+    if source_uri.startswith('shared:'):
+        return attach_dataset(source_uri.partition(':')[2])
+    builder = BailleursSociauxDashboard.__new__(BailleursSociauxDashboard)
+    builder.seed = seed
+    builder.data_source = data_source_from_uri(source_uri, seed)
+    return builder.build_dataset()
+
+def source_version(source_uri, seed):
+    """Version que produirait la source dans son état actuel, sans charger les données"""
+    if source_uri.startswith('shared:'):
+        with open(os.path.join(source_uri.partition(':')[2], 'manifest.json'), encoding='utf-8') as f:
+            return json.load(f)['version']
+    return f"{data_source_from_uri(source_uri, seed).fingerprint()}-{seed}"
+
+@st.cache_resource(show_spinner="Chargement des données...")
+def get_data_store(source_uri, seed):
+    """Version courante des données d'une source, construite une fois par processus et mise à jour par ingest()
+    
+    Le store est le seul détenteur du jeu de données : une version remplacée par
+    replace() ou ingest() est libérée dès que plus aucune session ne la lit.
+    """
+    if SNAPSHOT_DIR and not source_uri.startswith('shared:'):
+        return DataStore(*load_snapshot(source_uri, seed))
+    return DataStore(read_dataset(source_uri, seed))
+
+class BailleursSociauxDashboard:
+    def __init__(self, source_uri=DATA_SOURCE_URI, seed=DATA_SEED, dataset=None, cube=None):
+        self.source_uri = source_uri
+        self.seed = seed
+        self.store = get_data_store(source_uri, seed) if dataset is None else DataStore(dataset, cube)
+        self.dataset, self.filter_engine, self.cube = self.store.current()
+        self.figures = get_figure_cache()
+        self.maps = get_map_cache()
+        self.view = self.filter_engine.apply()
+        # Mesures de l'exécution en cours, None si l'instrumentation est désactivée
+        self.profile = None
+        
+        # Copies superficielles : grâce au copy-on-write, une modification locale
+        # à la session ne se propage jamais au jeu de données partagé
+        self.bailleurs_data = list(self.dataset['bailleurs_data'])
+        for name in DATASET_FRAMES:
+            setattr(self, name, self.dataset[name].copy(deep=False))
+    
+    def build_dataset(self):
+        """Construit l'ensemble des données du dashboard depuis la source (sans cache)"""
+        self.bailleurs_data = self.define_bailleurs_data()
+        self.parc_data = self.initialize_parc_data()
+        self.historical_data = self.initialize_historical_data()
+        self.projets_data = self.initialize_projets_data()
+        self.demande_data = self.initialize_demande_data()
+        self.financement_data = self.initialize_financement_data()
+        self.harmonize_categories()
+        self.projets_data = locate_projets(self.projets_data, self.seed)
+        
+        # Variations affichées avec les KPI, tirées une fois avec le reste des données
+        rng = entity_rng(self.seed, 'kpi')
+        kpi_variations = {
+            'parc': rng.uniform(2, 4),
+            'construction': rng.uniform(3, 6),
+            'demande': rng.uniform(-2, 2),
+            'investissement': rng.uniform(5, 8)
+        }
+        
+        dataset = {name: getattr(self, name) for name in DATASET_FRAMES}
+        dataset['bailleurs_data'] = tuple(MappingProxyType(b) for b in self.bailleurs_data)
+        dataset['kpi_variations'] = MappingProxyType(kpi_variations)
+        dataset['built_at'] = datetime.now()
+        dataset['version'] = f"{self.data_source.fingerprint()}-{self.seed}"
+        dataset['versions'] = MappingProxyType({table: f"{table}@{dataset['version']}" for table in TABLE_SCHEMAS})
+        dataset['seed'] = self.seed
+        return MappingProxyType(dataset)
+        
+    def harmonize_categories(self):
+        """Aligne les catégories des colonnes de dimension : mêmes codes dans toutes les tables"""
+        references = {
+            'bailleur': [b['nom'] for b in self.bailleurs_data],
+            'type_logement': TYPES_LOGEMENT,
+            'micro_region': MICROREGIONS,
+            'type_projet': TYPES_PROJET,
+            'statut': STATUTS_PROJET
+        }
+        for name in DATASET_FRAMES:
+            frame = getattr(self, name)
+            for column, reference in references.items():
+                if column not in frame or not isinstance(frame[column].dtype, pd.CategoricalDtype):
+                    continue
+                current = list(frame[column].cat.categories)
+                categories = list(reference) + [c for c in current if c not in set(reference)]
+                if current != categories:
+                    frame[column] = frame[column].cat.set_categories(categories)
+    
+    def define_bailleurs_data(self):
+        """Charge le référentiel des bailleurs sociaux"""
+        return self.data_source.load('bailleurs').to_dict('records')
+    
+    def initialize_parc_data(self):
+        """Initialise les données détaillées du parc par bailleur"""
+        return self.data_source.load('parc')
+    
+    def initialize_historical_data(self):
+        """Initialise les données historiques"""
+        return self.data_source.load('historique')
     
     def initialize_projets_data(self):
         """Initialise les données des projets en cours"""
-        projets = []
-        microregions = ['Nord', 'Sud', 'Ouest', 'Est']
-        types_projet = ['Neuf', 'Rénovation', 'Réhabilitation', 'ANRU', 'Démolition-Reconstruction']
-        
-        for i in range(50):  # 50 projets simulés
-            bailleur = np.random.choice([b['nom'] for b in self.bailleurs_data])
-            microregion = np.random.choice(microregions)
-            type_projet = np.random.choice(types_projet)
-            
-            projets.append({
-                'nom_projet': f"Projet {i+1} - {microregion}",
-                'bailleur': bailleur,
-                'micro_region': microregion,
-                'type_projet': type_projet,
-                'logements_prevus': np.random.randint(20, 200),
-                'investissement': np.random.uniform(5, 50),
-                'date_debut': datetime.now() - timedelta(days=np.random.randint(0, 365)),
-                'date_fin_prevue': datetime.now() + timedelta(days=np.random.randint(180, 720)),
-                'avancement': np.random.uniform(10, 95),
-                'statut': np.random.choice(['En étude', 'En travaux', 'En livraison', 'Terminé'])
-            })
-        
-        return pd.DataFrame(projets)
+        return self.data_source.load('projets')
     
     def initialize_demande_data(self):
         """Initialise les données de demande de logement social"""
-        communes = ['Saint-Denis', 'Saint-Paul', 'Saint-Pierre', 'Le Tampon', 'Saint-Louis', 
-                   'Saint-André', 'Saint-Benoît', 'Saint-Joseph', 'Sainte-Marie', 'Le Port']
-        
-        data = []
-        for commune in communes:
-            data.append({
-                'commune': commune,
-                'demande_totale': np.random.randint(800, 3500),
-                'attente_moyenne_mois': np.random.uniform(18, 48),
-                'taux_satisfaction': np.random.uniform(15, 40),
-                'demande_urgence': np.random.randint(50, 300),
-                'revenu_moyen_demandeur': np.random.uniform(1200, 2200)
-            })
-        
-        return pd.DataFrame(data)
+        return self.data_source.load('demande')
     
     def initialize_financement_data(self):
         """Initialise les données de financement"""
-        financeurs = ['État', 'Région', 'Département', 'ANRU', 'Europe', 'Action Logement', 'CDC']
-        data = []
-        
-        for financeur in financeurs:
-            data.append({
-                'financeur': financeur,
-                'montant_annuel': np.random.uniform(10, 100),
-                'type_aide': np.random.choice(['Subvention', 'Prêt', 'Avance', 'Garantie']),
-                'taux_intervention': np.random.uniform(10, 40),
-                'projets_soutenus': np.random.randint(5, 30)
-            })
-        
-        return pd.DataFrame(data)
+        return self.data_source.load('financement')
     
     def display_header(self):
         """Affiche l'en-tête du dashboard"""
@@ -371,7 +2598,7 @@ class BailleursSociauxDashboard:
         with col2:
             st.markdown("**Analyse stratégique du parc social réunionnais - Données 2024**")
         
-        current_time = datetime.now().strftime('%d/%m/%Y %H:%M')
+        current_time = self.dataset['built_at'].strftime('%d/%m/%Y %H:%M')
         st.sidebar.markdown(f"**🕐 Dernière mise à jour: {current_time}**")
     
     def display_key_metrics(self):
@@ -379,11 +2606,12 @@ class BailleursSociauxDashboard:
         st.markdown('<h3 class="section-header">📊 INDICATEURS CLÉS DU PARC SOCIAL</h3>', 
                    unsafe_allow_html=True)
         
-        # Calcul des métriques globales
-        parc_total = sum([b['parc_total'] for b in self.bailleurs_data])
-        construction_annuelle = sum([b['logements_construction_an'] for b in self.bailleurs_data])
-        demande_totale = self.demande_data['demande_totale'].sum()
-        investissement_total = sum([b['investissement_annuel'] for b in self.bailleurs_data])
+        # Métriques globales, précalculées par le cube d'agrégats
+        parc_total = self.cube.totals['parc_total']
+        construction_annuelle = self.cube.totals['logements_construction_an']
+        demande_totale = self.cube.totals['demande_totale']
+        investissement_total = self.cube.totals['investissement_annuel']
+        variations = self.dataset['kpi_variations']
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -391,398 +2619,555 @@ class BailleursSociauxDashboard:
             st.metric(
                 "Parc social total",
                 f"{parc_total:,} logements",
-                f"+{np.random.uniform(2, 4):.1f}% vs 2023"
+                f"+{variations['parc']:.1f}% vs 2023"
             )
         
         with col2:
             st.metric(
                 "Construction annuelle",
                 f"{construction_annuelle:,} logements/an",
-                f"+{np.random.uniform(3, 6):.1f}%"
+                f"+{variations['construction']:.1f}%"
             )
         
         with col3:
             st.metric(
                 "Demande en attente",
                 f"{demande_totale:,} ménages",
-                f"{np.random.uniform(-2, 2):.1f}%"
+                f"{variations['demande']:.1f}%"
             )
         
         with col4:
             st.metric(
                 "Investissement annuel",
                 f"{investissement_total:.1f} M€",
-                f"+{np.random.uniform(5, 8):.1f}%"
+                f"+{variations['investissement']:.1f}%"
             )
     
+    def parc_aggregate(self, by):
+        """Parc de la vue filtrée agrégé par dimension, lu dans le cube (sommes et moyennes)"""
+        bailleurs, types, _, _ = self.view.key
+        agg = self.cube.parc.query(by, bailleur=bailleurs, type_logement=types)
+        agg['loyer_moyen'] = agg['loyer_moyen'] / agg['count']
+        agg['taux_vacance'] = agg['taux_vacance'] / agg['count']
+        return agg
+    
+    def projets_aggregate(self, by):
+        """Projets de la vue filtrée agrégés par dimension"""
+        bailleurs = self.view.key[0]
+        agg = self.cube.projets.query(by, bailleur=bailleurs)
+        if agg['count'].sum() == len(self.view.projets):
+            return agg
+        # La période exclut des projets : le cube n'a pas de dimension temporelle
+        return self.view.projets.groupby(by, observed=True).agg(
+            logements_prevus=('logements_prevus', 'sum'),
+            investissement=('investissement', 'sum'),
+            count=(by, 'size')
+        ).reset_index()
+    
+    def figure(self, chart_id, build, *filters):
+        """Figure mémoïsée par (graphique, versions des tables utilisées, filtres)"""
+        construct = build
+        build = lambda: compact_figure(construct())
+        if self.profile is not None:
+            build = self.profiled_build('figure', chart_id, build)
+        fig, size = self.figures.lookup((chart_id, self.data_versions(chart_id), filters), build)
+        if self.profile is not None:
+            self.profile.names[id(fig)] = chart_id
+            self.profile.sizes[id(fig)] = size
+        return fig
+    
+    def profiled_build(self, kind, name, build):
+        """Construction mesurée d'une figure ou d'une carte (appelée seulement hors cache)"""
+        def timed_build():
+            with self.profile.timed(kind, name) as record:
+                result = build()
+                if kind == 'figure':
+                    record['rows'] = figure_points(result)
+                return result
+        return timed_build
+    
+    def timed(self, kind, name):
+        """Mesure d'un bloc si l'instrumentation est active, sans effet sinon"""
+        if self.profile is None:
+            return nullcontext({})
+        return self.profile.timed(kind, name)
+    
+    def plotly_chart(self, fig):
+        """Envoie une figure plotly au navigateur, avec sa taille mesurée par le cache si l'instrumentation est active"""
+        if self.profile is None:
+            st.plotly_chart(fig, use_container_width=True)
+            return
+        with self.profile.timed('envoi', self.profile.names.get(id(fig), 'figure')) as record:
+            record['rows'] = figure_points(fig)
+            record['bytes'] = self.profile.sizes.get(id(fig))
+            st.plotly_chart(fig, use_container_width=True)
+    
+    def data_versions(self, chart_id):
+        """Versions des tables dont dépend une figure (version globale à défaut)"""
+        tables = FIGURE_TABLES.get(chart_id)
+        if tables is None:
+            return (self.dataset['version'],)
+        return tuple(self.dataset['versions'][table] for table in tables)
+    
+    def display_map(self, map_id, build, *filters, width=1000, height=500):
+        """Affiche une carte folium dont le HTML est mémoïsé par (carte, versions des données, filtres)"""
+        render = lambda: folium.Figure().add_child(build()).render()
+        if self.profile is not None:
+            render = self.profiled_build('carte', map_id, render)
+        page = self.maps.get((map_id, self.data_versions(map_id), filters), render)
+        
+        with self.timed('envoi', map_id) as record:
+            record['bytes'] = len(page)
+            if hasattr(st, 'iframe'):
+                st.iframe(page, width=width, height=height + 10)
+            else:
+                components.html(page, height=height + 10, width=width)  # anciennes versions de Streamlit
+    
+    def select_tab(self, labels, key):
+        """Sélecteur d'onglet : contrairement à st.tabs, seul l'onglet actif est rendu"""
+        return st.radio(key, labels, horizontal=True, key=key, label_visibility="collapsed")
+    
     def create_bailleurs_overview(self):
         """Vue d'ensemble des bailleurs sociaux"""
         st.markdown('<h3 class="section-header">🏢 VUE D\'ENSEMBLE DES BAILLEURS SOCIAUX</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3, tab4 = st.tabs(["Carte Interactive", "Performance Financière", "Répartition du Parc", "Indicateurs de Gestion"])
+        onglet = self.select_tab(["Carte Interactive", "Performance Financière", "Répartition du Parc", "Indicateurs de Gestion"], key='tab_overview')
         
-        with tab1:
+        if onglet == "Carte Interactive":
             # Carte interactive des bailleurs
             st.subheader("Implantation des bailleurs sociaux")
             
-            m = folium.Map(location=[-21.115, 55.536], zoom_start=10)
-            
-            for bailleur in self.bailleurs_data:
-                # Couleur selon la performance
-                if bailleur['performance_gestion'] == 'Excellente':
-                    color = 'green'
-                elif bailleur['performance_gestion'] == 'Élevée':
-                    color = 'blue'
-                elif bailleur['performance_gestion'] == 'Moyenne':
-                    color = 'orange'
-                else:
-                    color = 'red'
-                
-                popup_text = f"""
-                <b>{bailleur['nom']}</b><br>
-                Siège: {bailleur['siege']}<br>
-                Parc: {bailleur['parc_total']:,} logements<br>
-                Performance: {bailleur['performance_gestion']}<br>
-                Construction: {bailleur['logements_construction_an']}/an<br>
-                CA: {bailleur['chiffre_affaires']} M€
-                """
-                
-                folium.Marker(
-                    [bailleur['lat'], bailleur['lon']],
-                    popup=folium.Popup(popup_text, max_width=300),
-                    tooltip=f"{bailleur['nom']} - {bailleur['parc_total']:,} logements",
-                    icon=folium.Icon(color=color, icon='home', prefix='fa')
-                ).add_to(m)
-            
-            folium_static(m, width=1000, height=500)
+            self.display_map('implantation_bailleurs', self.build_bailleurs_map)
         
-        with tab2:
+        elif onglet == "Performance Financière":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Chiffre d'affaires par bailleur
-                df_bailleurs = pd.DataFrame(self.bailleurs_data)
-                fig = px.bar(df_bailleurs, 
-                            x='nom', 
-                            y='chiffre_affaires',
-                            title='Chiffre d\'affaires par bailleur (M€)',
-                            color='performance_gestion',
-                            color_discrete_map={
-                                'Excellente': '#28a745',
-                                'Élevée': '#17a2b8',
-                                'Moyenne': '#ffc107',
-                                'Faible': '#dc3545'
-                            })
-                fig.update_layout(xaxis_title="Bailleur", yaxis_title="Chiffre d'affaires (M€)")
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('ca_par_bailleur', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='nom',
+                    y='chiffre_affaires',
+                    title='Chiffre d\'affaires par bailleur (M€)',
+                    color='performance_gestion',
+                    color_discrete_map={
+                        'Excellente': '#28a745',
+                        'Élevée': '#17a2b8',
+                        'Moyenne': '#ffc107',
+                        'Faible': '#dc3545'
+                    }).update_layout(xaxis_title="Bailleur", yaxis_title="Chiffre d'affaires (M€)"))
+                self.plotly_chart(fig)
             
             with col2:
                 # Investissement par logement
-                df_bailleurs['investissement_par_logement'] = df_bailleurs['investissement_annuel'] * 1000000 / df_bailleurs['parc_total']
-                fig = px.bar(df_bailleurs, 
-                            x='nom', 
-                            y='investissement_par_logement',
-                            title='Investissement annuel par logement (€)',
-                            color='performance_gestion',
-                            color_discrete_map={
-                                'Excellente': '#28a745',
-                                'Élevée': '#17a2b8',
-                                'Moyenne': '#ffc107',
-                                'Faible': '#dc3545'
-                            })
-                fig.update_layout(xaxis_title="Bailleur", yaxis_title="Investissement par logement (€)")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
+                fig = self.figure('investissement_par_logement', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data).assign(investissement_par_logement=lambda df: df['investissement_annuel'] * 1000000 / df['parc_total']),
+                    x='nom',
+                    y='investissement_par_logement',
+                    title='Investissement annuel par logement (€)',
+                    color='performance_gestion',
+                    color_discrete_map={
+                        'Excellente': '#28a745',
+                        'Élevée': '#17a2b8',
+                        'Moyenne': '#ffc107',
+                        'Faible': '#dc3545'
+                    }).update_layout(xaxis_title="Bailleur", yaxis_title="Investissement par logement (€)"))
+                self.plotly_chart(fig)
+        
+        elif onglet == "Répartition du Parc":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Répartition du parc par bailleur
-                fig = px.pie(pd.DataFrame(self.bailleurs_data), 
-                            values='parc_total', 
-                            names='nom',
-                            title='Répartition du parc social par bailleur')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('parc_par_bailleur', lambda: px.pie(
+                    pd.DataFrame(self.bailleurs_data),
+                    values='parc_total',
+                    names='nom',
+                    title='Répartition du parc social par bailleur'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Production annuelle par bailleur
-                fig = px.bar(pd.DataFrame(self.bailleurs_data), 
-                            x='nom', 
-                            y='logements_construction_an',
-                            title='Production annuelle de logements par bailleur',
-                            color='type',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                fig.update_layout(xaxis_title="Bailleur", yaxis_title="Logements construits/an")
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab4:
+                fig = self.figure('production_par_bailleur', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='nom',
+                    y='logements_construction_an',
+                    title='Production annuelle de logements par bailleur',
+                    color='type',
+                    color_discrete_sequence=px.colors.qualitative.Set3).update_layout(xaxis_title="Bailleur", yaxis_title="Logements construits/an"))
+                self.plotly_chart(fig)
+        
+        elif onglet == "Indicateurs de Gestion":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Taux d'impayés
-                fig = px.bar(pd.DataFrame(self.bailleurs_data), 
-                            x='nom', 
-                            y='taux_impayes',
-                            title='Taux d\'impayés par bailleur (%)',
-                            color='taux_impayes',
-                            color_continuous_scale='RdYlGn_r')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('impayes_par_bailleur', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='nom',
+                    y='taux_impayes',
+                    title='Taux d\'impayés par bailleur (%)',
+                    color='taux_impayes',
+                    color_continuous_scale='RdYlGn_r'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Taux de rotation
-                fig = px.bar(pd.DataFrame(self.bailleurs_data), 
-                            x='nom', 
-                            y='taux_rotation',
-                            title='Taux de rotation du parc (%)',
-                            color='taux_rotation',
-                            color_continuous_scale='Blues')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('rotation_par_bailleur', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='nom',
+                    y='taux_rotation',
+                    title='Taux de rotation du parc (%)',
+                    color='taux_rotation',
+                    color_continuous_scale='Blues'))
+                self.plotly_chart(fig)
     
     def create_parc_analysis(self):
         """Analyse détaillée du parc social"""
         st.markdown('<h3 class="section-header">🏠 ANALYSE DU PARC SOCIAL</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Typologie des Logements", "Performance Locative", "Rénovation Énergétique"])
+        onglet = self.select_tab(["Typologie des Logements", "Performance Locative", "Rénovation Énergétique"], key='tab_parc')
         
-        with tab1:
+        if onglet == "Typologie des Logements":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Répartition par type de logement
-                type_agg = self.parc_data.groupby('type_logement')['nombre_logements'].sum().reset_index()
-                fig = px.pie(type_agg, 
-                            values='nombre_logements', 
-                            names='type_logement',
-                            title='Répartition du parc par type de logement')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('parc_par_type', lambda: px.pie(
+                    self.parc_aggregate('type_logement'),
+                    values='nombre_logements',
+                    names='type_logement',
+                    title='Répartition du parc par type de logement'), self.view.key)
+                self.plotly_chart(fig)
             
             with col2:
                 # Loyer moyen par type
-                loyer_agg = self.parc_data.groupby('type_logement')['loyer_moyen'].mean().reset_index()
-                fig = px.bar(loyer_agg, 
-                            x='type_logement', 
-                            y='loyer_moyen',
-                            title='Loyer moyen par type de logement (€)',
-                            color='loyer_moyen',
-                            color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
+                fig = self.figure('loyer_par_type', lambda: px.bar(
+                    self.parc_aggregate('type_logement'),
+                    x='type_logement',
+                    y='loyer_moyen',
+                    title='Loyer moyen par type de logement (€)',
+                    color='loyer_moyen',
+                    color_continuous_scale='Viridis'), self.view.key)
+                self.plotly_chart(fig)
+        
+        elif onglet == "Performance Locative":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Taux de vacance par bailleur
-                vacance_agg = self.parc_data.groupby('bailleur')['taux_vacance'].mean().reset_index()
-                fig = px.bar(vacance_agg, 
-                            x='bailleur', 
-                            y='taux_vacance',
-                            title='Taux de vacance moyen par bailleur (%)',
-                            color='taux_vacance',
-                            color_continuous_scale='RdYlGn_r')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('vacance_par_bailleur', lambda: px.bar(
+                    self.parc_aggregate('bailleur'),
+                    x='bailleur',
+                    y='taux_vacance',
+                    title='Taux de vacance moyen par bailleur (%)',
+                    color='taux_vacance',
+                    color_continuous_scale='RdYlGn_r'), self.view.key)
+                self.plotly_chart(fig)
             
             with col2:
                 # Performance locative par type
-                fig = px.box(self.parc_data, 
-                            x='type_logement', 
-                            y='taux_vacance',
-                            title='Distribution des taux de vacance par type de logement')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('vacance_par_type', lambda: box_figure(
+                    self.view.parc,
+                    x='type_logement',
+                    y='taux_vacance',
+                    title='Distribution des taux de vacance par type de logement'), self.view.key)
+                self.plotly_chart(fig)
         
-        with tab3:
+        elif onglet == "Rénovation Énergétique":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Taux de rénovation énergétique
-                df_bailleurs = pd.DataFrame(self.bailleurs_data)
-                fig = px.bar(df_bailleurs, 
-                            x='nom', 
-                            y='taux_renovation_energetique',
-                            title='Taux de rénovation énergétique par bailleur (%)',
-                            color='taux_renovation_energetique',
-                            color_continuous_scale='Greens')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('renovation_par_bailleur', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='nom',
+                    y='taux_renovation_energetique',
+                    title='Taux de rénovation énergétique par bailleur (%)',
+                    color='taux_renovation_energetique',
+                    color_continuous_scale='Greens'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Relation rénovation/performance
-                fig = px.scatter(df_bailleurs, 
-                               x='taux_renovation_energetique', 
-                               y='performance_gestion',
-                               size='parc_total',
-                               title='Relation rénovation énergétique et performance',
-                               hover_name='nom',
-                               size_max=30)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('renovation_performance', lambda: px.scatter(
+                    pd.DataFrame(self.bailleurs_data),
+                    x='taux_renovation_energetique',
+                    y='performance_gestion',
+                    size='parc_total',
+                    title='Relation rénovation énergétique et performance',
+                    hover_name='nom',
+                    size_max=30))
+                self.plotly_chart(fig)
     
     def create_projets_analysis(self):
         """Analyse des projets en cours"""
         st.markdown('<h3 class="section-header">🏗️ PROJETS ET INVESTISSEMENTS</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Carte des Projets", "Avancement", "Financements"])
+        onglet = self.select_tab(["Carte des Projets", "Avancement", "Financements"], key='tab_projets')
         
-        with tab1:
+        if onglet == "Carte des Projets":
             # Carte des projets
             st.subheader("Carte des projets de construction et rénovation")
             
-            m = folium.Map(location=[-21.115, 55.536], zoom_start=10)
-            
-            # Coordonnées approximatives par micro-région
-            microregion_coords = {
-                'Nord': [-20.8789, 55.4481],
-                'Sud': [-21.3393, 55.4781],
-                'Ouest': [-21.0097, 55.2697],
-                'Est': [-21.0339, 55.7147]
-            }
-            
-            for microregion, coords in microregion_coords.items():
-                projets_region = self.projets_data[self.projets_data['micro_region'] == microregion]
-                
-                for _, projet in projets_region.iterrows():
-                    # Légère variation des coordonnées pour éviter superposition
-                    lat = coords[0] + np.random.uniform(-0.05, 0.05)
-                    lon = coords[1] + np.random.uniform(-0.05, 0.05)
-                    
-                    # Couleur selon l'avancement
-                    if projet['avancement'] > 75:
-                        color = 'green'
-                    elif projet['avancement'] > 50:
-                        color = 'orange'
-                    elif projet['avancement'] > 25:
-                        color = 'blue'
-                    else:
-                        color = 'red'
-                    
-                    popup_text = f"""
-                    <b>{projet['nom_projet']}</b><br>
-                    Bailleur: {projet['bailleur']}<br>
-                    Logements: {projet['logements_prevus']}<br>
-                    Investissement: {projet['investissement']:.1f} M€<br>
-                    Avancement: {projet['avancement']:.0f}%<br>
-                    Statut: {projet['statut']}
-                    """
-                    
-                    folium.Marker(
-                        [lat, lon],
-                        popup=folium.Popup(popup_text, max_width=300),
-                        tooltip=projet['nom_projet'],
-                        icon=folium.Icon(color=color, icon='wrench', prefix='fa')
-                    ).add_to(m)
-            
-            folium_static(m, width=1000, height=500)
+            self.display_map('carte_projets',
+                             lambda: self.build_projets_map(self.view.projets, self.view.spatial().communes()),
+                             self.view.key)
         
-        with tab2:
+        elif onglet == "Avancement":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Avancement des projets par bailleur
-                fig = px.box(self.projets_data, 
-                            x='bailleur', 
-                            y='avancement',
-                            title='Avancement des projets par bailleur',
-                            color='bailleur')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('avancement_par_bailleur', lambda: box_figure(
+                    self.view.projets,
+                    x='bailleur',
+                    y='avancement',
+                    title='Avancement des projets par bailleur',
+                    color=True), self.view.key)
+                self.plotly_chart(fig)
             
             with col2:
                 # Répartition des types de projets
-                type_agg = self.projets_data.groupby('type_projet').agg({
-                    'logements_prevus': 'sum',
-                    'investissement': 'sum'
-                }).reset_index()
-                
-                fig = px.bar(type_agg, 
-                            x='type_projet', 
-                            y='logements_prevus',
-                            title='Logements prévus par type de projet',
-                            color='investissement',
-                            color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
+                fig = self.figure('logements_par_type_projet', lambda: px.bar(
+                    self.projets_aggregate('type_projet'),
+                    x='type_projet',
+                    y='logements_prevus',
+                    title='Logements prévus par type de projet',
+                    color='investissement',
+                    color_continuous_scale='Viridis'), self.view.key)
+                self.plotly_chart(fig)
+        
+        elif onglet == "Financements":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Financeurs
-                fig = px.pie(self.financement_data, 
-                            values='montant_annuel', 
-                            names='financeur',
-                            title='Répartition des financements par organisme')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('financements_par_organisme', lambda: px.pie(
+                    self.financement_data,
+                    values='montant_annuel',
+                    names='financeur',
+                    title='Répartition des financements par organisme'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Types d'aides
-                fig = px.bar(self.financement_data, 
-                            x='financeur', 
-                            y='montant_annuel',
-                            color='type_aide',
-                            title='Montants par financeur et type d\'aide',
-                            color_discrete_sequence=px.colors.qualitative.Set3)
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('montants_par_financeur', lambda: px.bar(
+                    self.financement_data,
+                    x='financeur',
+                    y='montant_annuel',
+                    color='type_aide',
+                    title='Montants par financeur et type d\'aide',
+                    color_discrete_sequence=px.colors.qualitative.Set3))
+                self.plotly_chart(fig)
+    
+    def build_bailleurs_map(self):
+        """Carte d'implantation des sièges des bailleurs"""
+        m = folium.Map(location=[-21.115, 55.536], zoom_start=10)
+        
+        for bailleur in self.bailleurs_data:
+            # Couleur selon la performance
+            if bailleur['performance_gestion'] == 'Excellente':
+                color = 'green'
+            elif bailleur['performance_gestion'] == 'Élevée':
+                color = 'blue'
+            elif bailleur['performance_gestion'] == 'Moyenne':
+                color = 'orange'
+            else:
+                color = 'red'
+            
+            popup_text = f"""
+            <b>{bailleur['nom']}</b><br>
+            Siège: {bailleur['siege']}<br>
+            Parc: {bailleur['parc_total']:,} logements<br>
+            Performance: {bailleur['performance_gestion']}<br>
+            Construction: {bailleur['logements_construction_an']}/an<br>
+            CA: {bailleur['chiffre_affaires']} M€
+            """
+            
+            folium.Marker(
+                [bailleur['lat'], bailleur['lon']],
+                popup=folium.Popup(popup_text, max_width=300),
+                tooltip=f"{bailleur['nom']} - {bailleur['parc_total']:,} logements",
+                icon=folium.Icon(color=color, icon='home', prefix='fa')
+            ).add_to(m)
+        return m
+    
+    def build_projets_map(self, projets, communes=None):
+        """Carte des projets : marqueurs individuels en petit nombre, agrégats au-delà
+        
+        Jusqu'à MAP_MARKER_LIMIT projets, les marqueurs sont créés côté navigateur à
+        partir de tableaux compacts (FastMarkerCluster) et leurs popups ne sont
+        construites qu'à l'ouverture. Au-delà, les projets sont agrégés côté serveur
+        sur une grille dont la finesse dépend du niveau de zoom : la taille de la carte
+        ne dépend plus du nombre de projets.
+        """
+        m = folium.Map(location=[-21.115, 55.536], zoom_start=10)
+        
+        # Coordonnées fixées au chargement des données (voir locate_projets)
+        lat = projets['lat'].to_numpy()
+        lon = projets['lon'].to_numpy()
+        
+        if len(projets) <= MAP_MARKER_LIMIT:
+            self.add_projets_markers(m, projets, lat, lon, communes)
+        else:
+            self.add_projets_clusters(m, projets, lat, lon)
+        return m
+    
+    def add_projets_markers(self, m, projets, lat, lon, communes=None):
+        """Marqueurs individuels générés côté navigateur, popups construites à la demande"""
+        # Couleur selon l'avancement : rouge (<25%), bleu, orange, vert (>75%)
+        avancement = projets['avancement'].to_numpy()
+        couleur = np.digitize(avancement, [25, 50, 75], right=True)
+        if communes is None:
+            communes = pd.Categorical.from_codes(nearest_commune(lat, lon), list(COMMUNES_COORDS))
+        
+        data = list(zip(
+            np.round(lat, 5).tolist(),
+            np.round(lon, 5).tolist(),
+            couleur.tolist(),
+            # Textes insérés tels quels dans le HTML du tooltip et de la popup : échappés ici
+            escape_column(projets['nom_projet']).tolist(),
+            projets['bailleur'].cat.codes.tolist(),
+            projets['logements_prevus'].tolist(),
+            np.round(projets['investissement'].to_numpy(), 1).tolist(),
+            np.round(avancement).astype('int64').tolist(),
+            projets['statut'].cat.codes.tolist(),
+            communes.codes.tolist()
+        ))
+        callback = """
+        function (row) {
+            var bailleurs = %s, statuts = %s, communes = %s;
+            var couleurs = ['red', 'blue', 'orange', 'green'];
+            var marker = L.circleMarker(new L.LatLng(row[0], row[1]),
+                                        {radius: 7, color: couleurs[row[2]], fillOpacity: 0.8});
+            marker.bindTooltip(row[3]);
+            marker.bindPopup(function () {
+                return '<b>' + row[3] + '</b><br>' +
+                       'Bailleur: ' + bailleurs[row[4]] + '<br>' +
+                       'Commune: ' + (communes[row[9]] || '-') + '<br>' +
+                       'Logements: ' + row[5] + '<br>' +
+                       'Investissement: ' + row[6].toFixed(1) + ' M€<br>' +
+                       'Avancement: ' + row[7] + '%%<br>' +
+                       'Statut: ' + statuts[row[8]];
+            }, {maxWidth: 300});
+            return marker;
+        }
+        """ % (json.dumps([html.escape(str(b)) for b in projets['bailleur'].cat.categories]),
+               json.dumps([html.escape(str(s)) for s in projets['statut'].cat.categories]),
+               json.dumps([html.escape(str(c)) for c in communes.categories]))
+        folium_plugins.FastMarkerCluster(data, callback=callback).add_to(m)
+    
+    def add_projets_clusters(self, m, projets, lat, lon):
+        """Agrégats de projets calculés côté serveur, une couche par niveau de zoom"""
+        logements = projets['logements_prevus'].to_numpy()
+        investissement = projets['investissement'].to_numpy()
+        avancement = projets['avancement'].to_numpy()
+        
+        levels = []
+        for min_zoom, cell in MAP_CLUSTER_LEVELS:
+            clusters = cluster_points(lat, lon, cell, logements=logements,
+                                      investissement=investissement, avancement=avancement)
+            # Une seule couche GeoJSON par niveau, construite directement depuis les tableaux
+            features = [
+                {
+                    'type': 'Feature',
+                    'geometry': {'type': 'Point', 'coordinates': [round(c_lon, 5), round(c_lat, 5)]},
+                    'properties': {
+                        'projets': count,
+                        'logements': round(c_logements),
+                        'investissement': round(c_invest, 1),
+                        'avancement': round(c_avancement / count),
+                        'rayon': round(6 + 3 * np.log2(count), 1)
+                    }
+                }
+                for c_lat, c_lon, count, c_logements, c_invest, c_avancement in zip(
+                    clusters['lat'].tolist(), clusters['lon'].tolist(), clusters['count'].tolist(),
+                    clusters['logements'].tolist(), clusters['investissement'].tolist(),
+                    clusters['avancement'].tolist())
+            ]
+            layer = folium.GeoJson(
+                {'type': 'FeatureCollection', 'features': features},
+                name=f"Agrégats zoom {min_zoom}+",
+                control=False,
+                marker=folium.CircleMarker(color='#0288D1', fill=True, fill_opacity=0.6),
+                style_function=lambda feature: {'radius': feature['properties']['rayon']},
+                tooltip=folium.GeoJsonTooltip(['projets'], aliases=['Projets']),
+                popup=folium.GeoJsonPopup(['projets', 'logements', 'investissement', 'avancement'],
+                                          aliases=['Projets', 'Logements', 'Investissement (M€)', 'Avancement moyen (%)'])
+            )
+            layer.add_to(m)
+            levels.append((min_zoom, layer))
+        zoom_level_layers(levels).add_to(m)
     
     def create_demande_analysis(self):
         """Analyse de la demande de logement social"""
         st.markdown('<h3 class="section-header">📈 ANALYSE DE LA DEMANDE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Démographie de la Demande", "Cartographie Territoriale", "Adéquation Offre-Demande"])
+        onglet = self.select_tab(["Démographie de la Demande", "Cartographie Territoriale", "Adéquation Offre-Demande"], key='tab_demande')
         
-        with tab1:
+        if onglet == "Démographie de la Demande":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Demande par commune
-                fig = px.bar(self.demande_data, 
-                            x='commune', 
-                            y='demande_totale',
-                            title='Demande de logement social par commune',
-                            color='demande_totale',
-                            color_continuous_scale='Reds')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('demande_par_commune', lambda: px.bar(
+                    self.demande_data,
+                    x='commune',
+                    y='demande_totale',
+                    title='Demande de logement social par commune',
+                    color='demande_totale',
+                    color_continuous_scale='Reds'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Temps d'attente
-                fig = px.bar(self.demande_data, 
-                            x='commune', 
-                            y='attente_moyenne_mois',
-                            title='Délai d\'attente moyen par commune (mois)',
-                            color='attente_moyenne_mois',
-                            color_continuous_scale='Oranges')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab2:
+                fig = self.figure('attente_par_commune', lambda: px.bar(
+                    self.demande_data,
+                    x='commune',
+                    y='attente_moyenne_mois',
+                    title='Délai d\'attente moyen par commune (mois)',
+                    color='attente_moyenne_mois',
+                    color_continuous_scale='Oranges'))
+                self.plotly_chart(fig)
+        
+        elif onglet == "Cartographie Territoriale":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Taux de satisfaction
-                fig = px.bar(self.demande_data, 
-                            x='commune', 
-                            y='taux_satisfaction',
-                            title='Taux de satisfaction des demandes par commune (%)',
-                            color='taux_satisfaction',
-                            color_continuous_scale='Greens')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('satisfaction_par_commune', lambda: px.bar(
+                    self.demande_data,
+                    x='commune',
+                    y='taux_satisfaction',
+                    title='Taux de satisfaction des demandes par commune (%)',
+                    color='taux_satisfaction',
+                    color_continuous_scale='Greens'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Revenu des demandeurs
-                fig = px.scatter(self.demande_data, 
-                               x='revenu_moyen_demandeur', 
-                               y='taux_satisfaction',
-                               size='demande_totale',
-                               title='Relation revenu moyen et taux de satisfaction',
-                               hover_name='commune',
-                               size_max=30)
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
+                fig = self.figure('revenu_satisfaction', lambda: px.scatter(
+                    self.demande_data,
+                    x='revenu_moyen_demandeur',
+                    y='taux_satisfaction',
+                    size='demande_totale',
+                    title='Relation revenu moyen et taux de satisfaction',
+                    hover_name='commune',
+                    size_max=30))
+                self.plotly_chart(fig)
+        
+        elif onglet == "Adéquation Offre-Demande":
             # Analyse d'adéquation
             st.subheader("Adéquation entre l'offre et la demande")
             
             # Calcul de l'adéquation (simulé)
-            offre_totale = sum([b['parc_total'] for b in self.bailleurs_data])
-            demande_totale = self.demande_data['demande_totale'].sum()
-            taux_couverture = (offre_totale / demande_totale) * 100
+            offre_totale = self.cube.totals['parc_total']
+            demande_totale = self.cube.totals['demande_totale']
             
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -790,23 +3175,77 @@ class BailleursSociauxDashboard:
             with col2:
                 st.metric("Demande totale", f"{demande_totale:,} ménages")
             with col3:
-                st.metric("Taux de couverture", f"{taux_couverture:.1f}%")
+                st.metric("Taux de couverture",
+                          f"{offre_totale / demande_totale * 100:.1f}%" if demande_totale > 0 else "—")
             
             # Graphique d'adéquation
-            fig = go.Figure()
-            fig.add_trace(go.Bar(name='Offre', x=['Total'], y=[offre_totale], marker_color='blue'))
-            fig.add_trace(go.Bar(name='Demande', x=['Total'], y=[demande_totale], marker_color='red'))
-            fig.update_layout(title='Adéquation Offre/Demande de logements sociaux')
-            st.plotly_chart(fig, use_container_width=True)
+            fig = self.figure('adequation_offre_demande', lambda: go.Figure([
+                go.Bar(name='Offre', x=['Total'], y=[offre_totale], marker_color='blue'),
+                go.Bar(name='Demande', x=['Total'], y=[demande_totale], marker_color='red')
+            ]).update_layout(title='Adéquation Offre/Demande de logements sociaux'))
+            self.plotly_chart(fig)
+            
+            # Appariement par commune et type de logement, pour chaque scénario
+            st.subheader("Couverture de la demande par commune et type de logement")
+            matcher = self.cube.matcher(self.dataset, self.filter_engine.base_indices[('projets', 'coords')].communes())
+            scenario = st.selectbox("Scénario:", list(SCENARIOS_ADEQUATION))
+            adequation = matcher.frame(scenario)
+            
+            # Moyennes pondérées par la demande : sans demande dans le périmètre, rien à afficher
+            attente = adequation.loc[np.isfinite(adequation['attente_mois'])]
+            demande = adequation['demande'].sum()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Couverture à un an",
+                          f"{adequation['attribuables'].sum() / demande:.0%}" if demande > 0 else "—")
+            with col2:
+                st.metric("Déficit à un an", f"{adequation['deficit'].sum():,.0f} ménages")
+            with col3:
+                st.metric("Attente moyenne",
+                          f"{np.average(attente['attente_mois'], weights=attente['demande']):.0f} mois"
+                          if attente['demande'].sum() > 0 else "—")
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                fig = self.figure('couverture_commune_type', lambda: px.imshow(
+                    adequation.pivot(index='commune', columns='type_logement', values='couverture')
+                              .reindex(index=matcher.communes, columns=matcher.types).clip(upper=2) * 100,
+                    color_continuous_scale='RdYlGn',
+                    zmin=0, zmax=200,
+                    aspect='auto',
+                    labels={'color': 'Couverture (%)'},
+                    title=f'Couverture de la demande à un an (%) - {scenario}'), scenario)
+                self.plotly_chart(fig)
+            
+            with col2:
+                fig = self.figure('deficit_par_scenario', lambda: px.bar(
+                    pd.DataFrame({
+                        'scenario': np.repeat(list(SCENARIOS_ADEQUATION), len(matcher.types)),
+                        'type_logement': np.tile(matcher.types, len(SCENARIOS_ADEQUATION)),
+                        'deficit': matcher.run()['deficit'].sum(axis=1).ravel()
+                    }),
+                    x='scenario',
+                    y='deficit',
+                    color='type_logement',
+                    title='Déficit à un an par scénario et type de logement'))
+                self.plotly_chart(fig)
+            
+            st.markdown("**Principaux déficits**")
+            st.dataframe(
+                adequation.nlargest(15, 'deficit')[['commune', 'type_logement', 'offre', 'demande', 'attribuables',
+                                                    'attente_mois', 'deficit']].round(1),
+                hide_index=True
+            )
     
     def create_strategic_analysis(self):
         """Analyse stratégique et recommandations"""
         st.markdown('<h3 class="section-header">🎯 ANALYSE STRATÉGIQUE</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["SWOT", "Recommandations", "Indicateurs de Performance"])
+        onglet = self.select_tab(["SWOT", "Recommandations", "Indicateurs de Performance", "Projections 2025-2040"],
+                                 key='tab_strategie')
         
-        with tab1:
+        if onglet == "SWOT":
             st.subheader("Analyse SWOT du parc social réunionnais")
             
             col1, col2, col3, col4 = st.columns(4)
@@ -851,7 +3290,7 @@ class BailleursSociauxDashboard:
                 - Changement climatique
                 """)
         
-        with tab2:
+        elif onglet == "Recommandations":
             st.subheader("Recommandations Stratégiques")
             
             col1, col2 = st.columns(2)
@@ -906,7 +3345,7 @@ class BailleursSociauxDashboard:
             - Excellence de service
             """)
         
-        with tab3:
+        elif onglet == "Indicateurs de Performance":
             st.subheader("Tableau de Bord Stratégique")
             
             # Indicateurs de performance
@@ -938,6 +3377,42 @@ class BailleursSociauxDashboard:
                 # Barre de progression
                 progression = (indicateur['valeur'] / indicateur['cible']) * 100
                 st.progress(min(progression / 100, 1.0))
+        
+        elif onglet == "Projections 2025-2040":
+            st.subheader("Projections Monte Carlo 2025-2040")
+            engine = self.cube.projections(self.dataset)
+            engine.start()
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                perimetre = st.selectbox("Périmètre:", ["Ensemble des bailleurs", *engine.bailleurs])
+            with col2:
+                indicateur = st.selectbox("Indicateur:", list(PROJECTION_INDICATEURS))
+            bailleur = engine.bailleurs.index(perimetre) if perimetre in engine.bailleurs else -1
+            running = not engine.finished()
+            
+            # Seul le graphique est réexécuté pendant le calcul, pour afficher les bandes affinées
+            @st.fragment(run_every=PROJECTION_POLL if running else None)
+            def display_projection():
+                centiles, scenarios = engine.bands()
+                if running and engine.finished():
+                    st.rerun(scope='app')
+                if engine.last_error is not None:
+                    st.error(f"Échec du calcul des projections: {engine.last_error}")
+                if centiles is None:
+                    st.info("⏳ Simulation des premiers scénarios en cours...")
+                    return
+                # Les bandes partielles changent à chaque lot : seules les bandes finales sont mémoïsées
+                build = lambda: projection_figure(centiles, indicateur, bailleur, perimetre)
+                if scenarios < engine.scenarios:
+                    fig = compact_figure(build())
+                else:
+                    fig = self.figure('projections', build, perimetre, indicateur)
+                self.plotly_chart(fig)
+                st.caption(f"{scenarios:,} scénarios simulés sur {engine.scenarios:,} • "
+                           f"bandes des centiles 5-95 % et 25-75 %")
+            
+            display_projection()
     
     def create_sidebar(self):
         """Crée la sidebar avec les contrôles"""
@@ -962,7 +3437,7 @@ class BailleursSociauxDashboard:
         st.sidebar.markdown("### 🏠 Types de logement")
         types_logement = st.sidebar.multiselect(
             "Types de logement:",
-            ['PLAI', 'PLUS', 'PLS', 'Intermediaire', 'Accession', 'Etudiant', 'Senior'],
+            TYPES_LOGEMENT,
             default=['PLAI', 'PLUS', 'PLS']
         )
         
@@ -972,6 +3447,10 @@ class BailleursSociauxDashboard:
         auto_refresh = st.sidebar.checkbox("Rafraîchissement automatique", value=False)
         
         if st.sidebar.button("🔄 Rafraîchir les données"):
+            # Invalide le jeu de données partagé par toutes les sessions du processus,
+            # après avoir arrêté les projections en cours sur l'ancienne version
+            self.store.close()
+            get_data_store.clear()
             st.rerun()
         
         # Indicateurs marché
@@ -1001,93 +3480,162 @@ class BailleursSociauxDashboard:
             'auto_refresh': auto_refresh
         }
 
+    def watch_data_version(self):
+        """Relance la session dès qu'une nouvelle version des données est publiée
+        
+        La source est surveillée par le thread partagé du processus ; la session se
+        contente de comparer périodiquement sa version à celle du store, sans
+        réexécuter la page tant que rien n'a changé.
+        """
+        scheduler = get_refresh_scheduler(self.source_uri, self.seed)
+        scheduler.start()
+        version = self.dataset['version']
+        
+        @st.fragment(run_every=scheduler.interval)
+        def check_version():
+            if self.store.current().dataset['version'] != version:
+                st.rerun(scope='app')
+            st.caption(f"🔁 Vérification des données toutes les {scheduler.interval} s")
+            if scheduler.last_error is not None:
+                st.caption(f"⚠️ Dernière vérification en échec: {scheduler.last_error}")
+        
+        with st.sidebar:
+            check_version()
+    
     def run_dashboard(self):
         """Exécute le dashboard complet"""
         # Sidebar
         controls = self.create_sidebar()
         
+        # Instrumentation active avec les détails techniques ou si un export est configuré
+        if controls['show_details'] or METRICS_LOG or METRICS_PROM:
+            self.profile = RunProfile()
+        
+        # Filtres appliqués une seule fois, puis partagés par toutes les sections
+        with self.timed('filtres', 'apply') as record:
+            self.view = self.filter_engine.apply(controls)
+            record['rows'] = len(self.view.parc) + len(self.view.historique) + len(self.view.projets)
+        
+        if controls['auto_refresh']:
+            self.watch_data_version()
+        
         # Header
         self.display_header()
         
         # Métriques clés
         self.display_key_metrics()
         
-        # Navigation par onglets
-        tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
-            "📈 Vue d'ensemble", 
-            "🏢 Bailleurs", 
-            "🏠 Parc Social", 
-            "🏗️ Projets",
-            "📈 Demande", 
-            "🎯 Stratégie",
-            "ℹ️ À Propos"
-        ])
+        # Navigation : seule la section active est calculée et envoyée au navigateur
+        section = self.select_tab(list(SECTIONS), key='section')
+        with self.timed('section', SECTIONS[section]):
+            getattr(self, SECTIONS[section])()
+        self.display_downloads(SECTIONS[section])
         
-        with tab1:
-            self.create_bailleurs_overview()
+        if self.profile is not None and (METRICS_LOG or METRICS_PROM):
+            get_metrics_registry().record(self.profile, SECTIONS[section])
         
-        with tab2:
-            self.create_bailleurs_analysis()
+        if controls['show_details']:
+            self.display_performance()
+            stats = self.figures.stats()
+            with st.sidebar.expander("🗂️ Cache des figures"):
+                st.write(f"Entrées: {stats['entries']} ({stats['bytes'] / 1024:.0f} Ko)")
+                st.write(f"Succès: {stats['hits']} • Échecs: {stats['misses']} • Évictions: {stats['evictions']}")
+                st.write(f"Taux de succès: {stats['hit_rate']:.0%}")
+            stats = self.maps.stats()
+            with st.sidebar.expander("🗺️ Cache des cartes"):
+                st.write(f"Entrées: {stats['entries']} ({stats['bytes'] / 1024:.0f} Ko compressés)")
+                st.write(f"Succès: {stats['hits']} • Échecs: {stats['misses']} • Évictions: {stats['evictions']}")
+                st.write(f"Taux de succès: {stats['hit_rate']:.0%}")
+    
+    def display_downloads(self, section):
+        """Boutons de téléchargement des tables filtrées utilisées par la section
         
-        with tab3:
-            self.create_parc_analysis()
+        Le fichier n'est écrit qu'au clic, hors de l'exécution de la page, à partir
+        des tables de la vue filtrée partagée (voir export_frame).
+        """
+        tables = SECTION_EXPORTS.get(section)
+        if not tables:
+            return
+        with st.expander("📥 Télécharger les données filtrées"):
+            for table in tables:
+                frame = getattr(self.view, table)
+                col1, col2, col3 = st.columns([3, 1, 1])
+                with col1:
+                    st.markdown(f"**{table}** : {len(frame):,} lignes")
+                for col, fmt, mime in ((col2, 'csv', 'text/csv'), (col3, 'parquet', 'application/vnd.apache.parquet')):
+                    with col:
+                        st.download_button(
+                            fmt.upper(),
+                            data=lambda frame=frame, fmt=fmt: export_frame(frame, fmt),
+                            file_name=f"{table}.{fmt}",
+                            mime=mime,
+                            key=f"download_{table}_{fmt}",
+                            on_click='ignore'
+                        )
+    
+    def display_performance(self):
+        """Panneau des mesures de l'exécution en cours (durées, lignes, tailles envoyées)"""
+        records = pd.DataFrame(self.profile.records, columns=['kind', 'name', 'seconds', 'rows', 'bytes'])
+        records[['rows', 'bytes']] = records[['rows', 'bytes']].astype('Float64')
+        with st.sidebar.expander("⚙️ Performance"):
+            st.write(f"Exécution: {self.profile.elapsed() * 1000:.0f} ms")
+            envoi = records.loc[records['kind'] == 'envoi', 'bytes'].sum()
+            st.write(f"Envoyé au navigateur: {envoi / 1024:.0f} Ko")
+            st.dataframe(
+                records.assign(ms=(records['seconds'] * 1000).round(1), ko=(records['bytes'] / 1024).round(1))
+                       .rename(columns={'kind': 'type', 'name': 'élément', 'rows': 'lignes'})
+                       [['type', 'élément', 'ms', 'lignes', 'ko']],
+                hide_index=True
+            )
+    
+    def create_about_section(self):
+        """Présentation du dashboard et des sources de données"""
+        st.markdown("## 📋 À propos de ce dashboard")
+        st.markdown("""
+        Ce dashboard présente une analyse stratégique complète du parc social à La Réunion.
         
-        with tab4:
-            self.create_projets_analysis()
+        **Sources des données:**
+        - Observatoire des Bailleurs Sociaux de La Réunion
+        - INSEE - Recensement et statistiques
+        - DREAL Réunion
+        - Conseil Départemental
+        - Rapports annuels des bailleurs
         
-        with tab5:
-            self.create_demande_analysis()
+        **Période couverte:**
+        - Données historiques: 2015-2024
+        - Données courantes: 2024
+        - Projections: 2025-2040
         
-        with tab6:
-            self.create_strategic_analysis()
+        **Méthodologie:**
+        - Agrégation des données bailleurs
+        - Analyse comparative de performance
+        - Modélisation prospective (simulations Monte Carlo)
+        - Benchmark territorial
         
-        with tab7:
-            st.markdown("## 📋 À propos de ce dashboard")
-            st.markdown("""
-            Ce dashboard présente une analyse stratégique complète du parc social à La Réunion.
-            
-            **Sources des données:**
-            - Observatoire des Bailleurs Sociaux de La Réunion
-            - INSEE - Recensement et statistiques
-            - DREAL Réunion
-            - Conseil Départemental
-            - Rapports annuels des bailleurs
-            
-            **Période couverte:**
-            - Données historiques: 2015-2024
-            - Données courantes: 2024
-            - Projections: 2025-2040
-            
-            **Méthodologie:**
-            - Agrégation des données bailleurs
-            - Analyse comparative de performance
-            - Modélisation prospective
-            - Benchmark territorial
-            
-            **⚠️ Avertissement:** 
-            Les données présentées sont des agrégats et peuvent contenir des estimations.
-            Ce dashboard est un outil d'aide à la décision.
-            
-            **🔒 Confidentialité:** 
-            Toutes les données sensibles sont anonymisées.
-            """)
-            
-            st.markdown("---")
-            st.markdown("""
-            **📞 Contact:**
-            - Observatoire du Logement Social de La Réunion
-            - Site web: www.logement-social-reunion.gouv.fr
-            - Email: observatoire.logement@reunion.gouv.fr
-            """)
+        **⚠️ Avertissement:** 
+        Les données présentées sont des agrégats et peuvent contenir des estimations.
+        Ce dashboard est un outil d'aide à la décision.
+        
+        **🔒 Confidentialité:** 
+        Toutes les données sensibles sont anonymisées.
+        """)
+        
+        st.markdown("---")
+        st.markdown("""
+        **📞 Contact:**
+        - Observatoire du Logement Social de La Réunion
+        - Site web: www.logement-social-reunion.gouv.fr
+        - Email: observatoire.logement@reunion.gouv.fr
+        """)
 
     def create_bailleurs_analysis(self):
         """Analyse détaillée par bailleur"""
         st.markdown('<h3 class="section-header">🏢 ANALYSE PAR BAILLEUR</h3>', 
                    unsafe_allow_html=True)
         
-        tab1, tab2, tab3 = st.tabs(["Comparaison Bailleurs", "Performance Détail", "Fiche Bailleur"])
+        onglet = self.select_tab(["Comparaison Bailleurs", "Performance Détail", "Fiche Bailleur"], key='tab_bailleurs')
         
-        with tab1:
+        if onglet == "Comparaison Bailleurs":
             # Filtres pour les bailleurs
             col1, col2, col3 = st.columns(3)
             with col1:
@@ -1097,96 +3645,69 @@ class BailleursSociauxDashboard:
                 performance_filtre = st.selectbox("Performance:", 
                                                 ['Tous', 'Excellente', 'Élevée', 'Moyenne', 'Faible'])
             with col3:
-                tri_filtre = st.selectbox("Trier par:", 
-                                        ['Parc total', 'CA', 'Investissement', 'Performance'])
+                tri_filtre = st.selectbox("Trier par:", list(BAILLEURS_SORT_KEYS))
             
-            # Application des filtres
-            bailleurs_filtres = pd.DataFrame(self.bailleurs_data)
+            # Application des filtres sur les lignes préformatées de la version des données
+            bailleurs_filtres = self.cube.comparaison
             if type_filtre != 'Tous':
                 bailleurs_filtres = bailleurs_filtres[bailleurs_filtres['type'] == type_filtre]
             if performance_filtre != 'Tous':
                 bailleurs_filtres = bailleurs_filtres[bailleurs_filtres['performance_gestion'] == performance_filtre]
             
-            # Tri
-            if tri_filtre == 'Parc total':
-                bailleurs_filtres = bailleurs_filtres.sort_values('parc_total', ascending=False)
-            elif tri_filtre == 'CA':
-                bailleurs_filtres = bailleurs_filtres.sort_values('chiffre_affaires', ascending=False)
-            elif tri_filtre == 'Investissement':
-                bailleurs_filtres = bailleurs_filtres.sort_values('investissement_annuel', ascending=False)
-            elif tri_filtre == 'Performance':
-                order = {'Excellente': 4, 'Élevée': 3, 'Moyenne': 2, 'Faible': 1}
-                bailleurs_filtres['performance_order'] = bailleurs_filtres['performance_gestion'].map(order)
-                bailleurs_filtres = bailleurs_filtres.sort_values('performance_order', ascending=False)
+            # Tri côté serveur, stable pour que les pages ne se recouvrent pas
+            bailleurs_filtres = bailleurs_filtres.sort_values(BAILLEURS_SORT_KEYS[tri_filtre], ascending=False,
+                                                              kind='stable')
             
-            # Affichage des bailleurs
-            for _, bailleur in bailleurs_filtres.iterrows():
-                if bailleur['performance_gestion'] == 'Excellente':
-                    css_class = "performance-excellent"
-                elif bailleur['performance_gestion'] == 'Élevée':
-                    css_class = "performance-high"
-                elif bailleur['performance_gestion'] == 'Moyenne':
-                    css_class = "performance-medium"
-                else:
-                    css_class = "performance-low"
-                
-                col1, col2, col3, col4, col5 = st.columns([2, 1, 1, 1, 1])
-                with col1:
-                    st.markdown(f"**{bailleur['nom']}**")
-                    st.markdown(f"*{bailleur['description']}*")
-                    st.markdown(f"Siège: {bailleur['siege']} • Création: {bailleur['annee_creation']}")
-                with col2:
-                    st.markdown(f"**{bailleur['parc_total']:,}** logements")
-                    st.markdown(f"Construction: {bailleur['logements_construction_an']}/an")
-                with col3:
-                    st.markdown(f"**{bailleur['chiffre_affaires']} M€**")
-                    st.markdown(f"Investissement: {bailleur['investissement_annuel']} M€")
-                with col4:
-                    st.markdown(f"**{bailleur['performance_gestion']}**")
-                    st.markdown(f"Impayés: {bailleur['taux_impayes']}%")
-                with col5:
-                    st.markdown(f"<div class='{css_class}'>Performance: {bailleur['performance_gestion']}</div>", 
-                               unsafe_allow_html=True)
-                    st.markdown(f"Rotation: {bailleur['taux_rotation']}%")
-                
-                st.markdown("---")
+            # Pagination : seules les lignes de la page sont envoyées, en un seul bloc HTML
+            pages = max(1, -(-len(bailleurs_filtres) // BAILLEURS_PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1) if pages > 1 else 1
+            debut = (page - 1) * BAILLEURS_PAGE_SIZE
+            lignes = bailleurs_filtres['html'].iloc[debut:debut + BAILLEURS_PAGE_SIZE]
+            st.caption(f"Bailleurs {min(debut + 1, len(bailleurs_filtres))}–{debut + len(lignes)} "
+                       f"sur {len(bailleurs_filtres)} • page {page}/{pages}")
+            st.markdown(
+                "<table class='bailleurs-table'><thead><tr><th>Bailleur</th><th>Parc</th><th>Finances</th>"
+                "<th>Gestion</th><th>Performance</th></tr></thead><tbody>"
+                + ''.join(lignes) + "</tbody></table>",
+                unsafe_allow_html=True
+            )
         
-        with tab2:
+        elif onglet == "Performance Détail":
             col1, col2 = st.columns(2)
             
             with col1:
                 # Top des bailleurs par parc
-                top_parc = pd.DataFrame(self.bailleurs_data).nlargest(10, 'parc_total')
-                fig = px.bar(top_parc, 
-                            x='parc_total', 
-                            y='nom',
-                            orientation='h',
-                            title='Top 10 des bailleurs par taille de parc',
-                            color='parc_total',
-                            color_continuous_scale='Viridis')
-                st.plotly_chart(fig, use_container_width=True)
+                fig = self.figure('top_parc', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data).nlargest(10, 'parc_total'),
+                    x='parc_total',
+                    y='nom',
+                    orientation='h',
+                    title='Top 10 des bailleurs par taille de parc',
+                    color='parc_total',
+                    color_continuous_scale='Viridis'))
+                self.plotly_chart(fig)
             
             with col2:
                 # Top des bailleurs par investissement
-                top_invest = pd.DataFrame(self.bailleurs_data).nlargest(10, 'investissement_annuel')
-                fig = px.bar(top_invest, 
-                            x='investissement_annuel', 
-                            y='nom',
-                            orientation='h',
-                            title='Top 10 des bailleurs par investissement annuel (M€)',
-                            color='investissement_annuel',
-                            color_continuous_scale='Oranges')
-                st.plotly_chart(fig, use_container_width=True)
-        
-        with tab3:
+                fig = self.figure('top_investissement', lambda: px.bar(
+                    pd.DataFrame(self.bailleurs_data).nlargest(10, 'investissement_annuel'),
+                    x='investissement_annuel',
+                    y='nom',
+                    orientation='h',
+                    title='Top 10 des bailleurs par investissement annuel (M€)',
+                    color='investissement_annuel',
+                    color_continuous_scale='Oranges'))
+                self.plotly_chart(fig)
+        
+        elif onglet == "Fiche Bailleur":
             # Détails pour un bailleur sélectionné
             bailleur_selectionne = st.selectbox("Sélectionnez un bailleur:", 
-                                              [b['nom'] for b in self.bailleurs_data])
+                                              self.view.bailleurs)
             
             if bailleur_selectionne:
                 bailleur_data = next(b for b in self.bailleurs_data if b['nom'] == bailleur_selectionne)
-                historique_bailleur = self.historical_data[self.historical_data['bailleur'] == bailleur_selectionne]
-                parc_bailleur = self.parc_data[self.parc_data['bailleur'] == bailleur_selectionne]
+                historique_bailleur = self.view.slice('historique', 'bailleur', bailleur_selectionne)
+                parc_bailleur = self.view.slice('parc', 'bailleur', bailleur_selectionne)
                 
                 col1, col2 = st.columns(2)
                 
@@ -1211,29 +3732,30 @@ class BailleursSociauxDashboard:
                 
                 with col2:
                     # Graphique d'évolution du parc
-                    fig = px.line(historique_bailleur, 
-                                 x='date', 
-                                 y='parc_total',
-                                 title=f'Évolution du parc - {bailleur_selectionne}',
-                                 color_discrete_sequence=['#0288D1'])
-                    fig.update_layout(yaxis_title="Nombre de logements")
-                    st.plotly_chart(fig, use_container_width=True)
+                    fig = self.figure('evolution_parc', lambda: px.line(
+                        historique_bailleur,
+                        x='date',
+                        y='parc_total',
+                        title=f'Évolution du parc - {bailleur_selectionne}',
+                        color_discrete_sequence=['#0288D1']).update_layout(yaxis_title="Nombre de logements"), self.view.key, bailleur_selectionne)
+                    self.plotly_chart(fig)
                     
                     # Graphique d'évolution des investissements
-                    fig = px.line(historique_bailleur, 
-                                 x='date', 
-                                 y='investissement',
-                                 title=f'Évolution des investissements - {bailleur_selectionne}',
-                                 color_discrete_sequence=['#FF9800'])
-                    fig.update_layout(yaxis_title="Investissement (M€)")
-                    st.plotly_chart(fig, use_container_width=True)
+                    fig = self.figure('evolution_investissement', lambda: px.line(
+                        historique_bailleur,
+                        x='date',
+                        y='investissement',
+                        title=f'Évolution des investissements - {bailleur_selectionne}',
+                        color_discrete_sequence=['#FF9800']).update_layout(yaxis_title="Investissement (M€)"), self.view.key, bailleur_selectionne)
+                    self.plotly_chart(fig)
                     
                     # Répartition des types de logement
-                    fig = px.pie(parc_bailleur, 
-                                values='nombre_logements', 
-                                names='type_logement',
-                                title=f'Répartition du parc par type de logement')
-                    st.plotly_chart(fig, use_container_width=True)
+                    fig = self.figure('parc_bailleur_par_type', lambda: px.pie(
+                        parc_bailleur,
+                        values='nombre_logements',
+                        names='type_logement',
+                        title=f'Répartition du parc par type de logement'), self.view.key, bailleur_selectionne)
+                    self.plotly_chart(fig)
 
 # Lancement du dashboard
 if __name__ == "__main__":
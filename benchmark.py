@@ -0,0 +1,320 @@
+"""Banc d'essai du dashboard, sans serveur Streamlit
+
+Mesure le temps d'import du dashboard et de son premier affichage (en-tête et KPI)
+dans un processus neuf, puis, pour chaque taille de données simulées, la construction des données
+(génération de chaque table, jeu de données complet, filtres et agrégats,
+__init__ du dashboard) puis le rendu de chaque section et de chacun de ses
+onglets : temps à froid (caches vides) et à chaud, pic mémoire, octets JSON des
+figures et octets HTML des cartes. Le module `st` du dashboard est remplacé par
+un enregistreur qui n'affiche rien.
+
+    python benchmark.py                                   # tailles par défaut
+    python benchmark.py --uri "synthetic?bailleurs=500&projets=1000000&communes=24&annees=10"
+    python benchmark.py --output avant.json
+    python benchmark.py --output apres.json --compare avant.json
+"""
+import argparse
+import importlib.metadata
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import streamlit.config
+import streamlit.logger
+
+# Le dashboard est importé hors de `streamlit run` : les avertissements du mode
+# sans serveur n'ont pas d'intérêt ici. La configuration est lue d'abord, sans
+# quoi sa lecture différée rétablirait le niveau de log par défaut.
+streamlit.config.get_config_options()
+streamlit.logger.set_log_level('error')
+
+import numpy as np
+import pandas as pd
+
+import Dashboard
+
+# Tailles mesurées par défaut : jeu de référence, intermédiaire et volumétrie cible
+DEFAULT_URIS = [
+    'synthetic',
+    'synthetic?bailleurs=50&projets=10000&communes=24&annees=10',
+    'synthetic?bailleurs=500&projets=1000000&communes=24&annees=10'
+]
+
+# Premier affichage, exécuté dans un processus neuf : import du dashboard (et de ce
+# module, qui n'importe rien d'autre de coûteux), puis en-tête et KPI
+IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import benchmark
+imported = time.perf_counter() - start
+dataset = benchmark.Dashboard.read_dataset(sys.argv[1], int(sys.argv[2]))
+benchmark.Dashboard.st = benchmark.StubStreamlit()
+start = time.perf_counter()
+dashboard = benchmark.Dashboard.BailleursSociauxDashboard(dataset=dataset)
+dashboard.display_header()
+dashboard.display_key_metrics()
+print(json.dumps({'import': imported, 'first_paint': time.perf_counter() - start,
+                  'modules': [m for m in ('plotly.express', 'folium') if m in sys.modules]}))
+"""
+
+
+class StubStreamlit:
+    """Remplaçant du module streamlit : n'affiche rien, mesure ce qui serait envoyé au navigateur
+
+    Les widgets renvoient leur valeur par défaut, sauf les sélecteurs dont la valeur
+    est imposée par clé (`choices`) ; les options proposées par chaque sélecteur sont
+    relevées dans `options`.
+    """
+
+    def __init__(self):
+        self.choices = {}
+        self.options = {}
+        self.reset()
+        self.sidebar = self
+
+    def reset(self):
+        self.figures = 0
+        self.figure_bytes = 0
+        self.maps = 0
+        self.map_bytes = 0
+
+    def __getattr__(self, name):
+        # markdown, metric, write, caption... : aucun effet
+        return lambda *args, **kwargs: self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    def plotly_chart(self, fig, **kwargs):
+        self.figures += 1
+        self.figure_bytes += len(fig.to_json())
+
+    def iframe(self, src, **kwargs):
+        self.maps += 1
+        self.map_bytes += len(src.encode('utf-8'))
+
+    def html(self, page, **kwargs):
+        self.iframe(page)
+
+    def radio(self, label, options, key=None, **kwargs):
+        return self.choose(key or label, list(options), kwargs.get('index', 0))
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return self.choose(key or label, list(options), index)
+
+    def choose(self, key, options, index):
+        self.options[key] = options
+        choice = self.choices.get(key)
+        return choice if choice in options else (options[index] if options else None)
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default or [])
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value
+
+    def date_input(self, label, value=None, **kwargs):
+        return value.date() if isinstance(value, datetime) else value
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def fragment(self, *args, **kwargs):
+        return lambda function: function
+
+
+def measure(function, memory=True):
+    """Temps d'exécution et, si demandé, pic mémoire alloué par la fonction
+
+    tracemalloc ralentit fortement l'exécution : le pic mémoire est mesuré lors
+    d'une seconde exécution, distincte de celle qui est chronométrée.
+    """
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, seconds, peak
+
+
+def bench_startup(uri, seed):
+    """Import du dashboard et premier affichage, mesurés dans un processus neuf"""
+    probe = subprocess.run([sys.executable, '-c', IMPORT_PROBE, uri, str(seed)], capture_output=True, text=True,
+                           check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    timings = json.loads(probe.stdout.strip().splitlines()[-1])
+    return [
+        {'stage': 'demarrage', 'name': 'import Dashboard', 'seconds': timings['import']},
+        {'stage': 'demarrage', 'name': 'en-tête et KPI', 'seconds': timings['first_paint'],
+         'modules': timings['modules']}
+    ]
+
+
+def bench_construction(uri, seed, memory):
+    """Construction des données : tables simulées une à une, puis chaque étape du chargement"""
+    results = []
+    source = Dashboard.data_source_from_uri(uri, seed)
+    if isinstance(source, Dashboard.SyntheticDataSource):
+        bailleurs, seconds, peak = measure(source.generate_bailleurs, memory)
+        results.append(('generation', 'bailleurs', seconds, peak, len(bailleurs)))
+        for table, generate in (('parc', lambda: source.generate_parc(bailleurs)),
+                                ('historique', lambda: source.generate_historique(bailleurs)),
+                                ('projets', lambda: source.generate_projets(bailleurs)),
+                                ('demande', source.generate_demande),
+                                ('financement', source.generate_financement)):
+            frame, seconds, peak = measure(generate, memory)
+            results.append(('generation', table, seconds, peak, len(frame)))
+
+    dataset, seconds, peak = measure(lambda: Dashboard.read_dataset(uri, seed), memory)
+    results.append(('construction', 'read_dataset', seconds, peak, len(dataset['projets_data'])))
+    _, seconds, peak = measure(lambda: Dashboard.DataStore(dataset), memory)
+    results.append(('construction', 'DataStore', seconds, peak, None))
+    _, seconds, peak = measure(lambda: Dashboard.BailleursSociauxDashboard(dataset=dataset), memory)
+    results.append(('construction', '__init__', seconds, peak, None))
+    return dataset, [dict(zip(('stage', 'name', 'seconds', 'peak_bytes', 'rows'), r)) for r in results]
+
+
+def render(dashboard, stub, method):
+    """Rendu d'une méthode du dashboard ; retourne le nombre et la taille des figures et cartes envoyées"""
+    stub.reset()
+    getattr(dashboard, method)()
+    return stub.figures, stub.figure_bytes, stub.maps, stub.map_bytes
+
+
+def bench_sections(dataset, memory):
+    """Rendu de l'en-tête, des KPI et de chaque onglet de chaque section, à froid puis à chaud"""
+    stub = StubStreamlit()
+    Dashboard.st = stub
+    Dashboard.components = stub
+    dashboard = Dashboard.BailleursSociauxDashboard(dataset=dataset)
+    # Vue non filtrée : toutes les lignes de chaque taille mesurée, pas les valeurs par défaut de la sidebar
+    dashboard.view = dashboard.filter_engine.apply()
+
+    # Onglets de chaque section, relevés lors d'un premier rendu
+    targets = [('header', 'display_header', {}), ('kpi', 'display_key_metrics', {})]
+    for section, method in Dashboard.SECTIONS.items():
+        stub.options.clear()
+        stub.choices.clear()
+        render(dashboard, stub, method)
+        tab_keys = [key for key in stub.options if str(key).startswith('tab_')]
+        if not tab_keys:
+            targets.append((section, method, {}))
+        for key in tab_keys:
+            for tab in stub.options[key]:
+                targets.append((f"{section} / {tab}", method, {key: tab}))
+
+    results = []
+    for name, method, choices in targets:
+        stub.choices = dict(choices)
+        dashboard.figures = Dashboard.FigureCache()
+        dashboard.maps = Dashboard.MapCache()
+        (figures, figure_bytes, maps, map_bytes), cold, _ = measure(lambda: render(dashboard, stub, method), False)
+        _, warm, _ = measure(lambda: render(dashboard, stub, method), False)
+        peak = None
+        if memory:
+            # Pic mémoire d'un rendu à froid
+            tracemalloc.start()
+            dashboard.figures = Dashboard.FigureCache()
+            dashboard.maps = Dashboard.MapCache()
+            render(dashboard, stub, method)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append({
+            'stage': 'section', 'name': name, 'seconds': cold, 'warm_seconds': warm, 'peak_bytes': peak,
+            'figures': figures, 'figure_bytes': figure_bytes, 'maps': maps, 'map_bytes': map_bytes
+        })
+    return results
+
+
+def run(uris, seed, memory):
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'versions': {'pandas': pd.__version__, 'numpy': np.__version__,
+                     'plotly': importlib.metadata.version('plotly')},
+        'view': 'non filtrée (tous les bailleurs, types de logement et dates)',
+        'results': []
+    }
+    for uri in uris:
+        print(f"== {uri}", file=sys.stderr)
+        results = bench_startup(uri, seed)
+        dataset, construction = bench_construction(uri, seed, memory)
+        results += construction
+        results += bench_sections(dataset, memory)
+        for result in results:
+            result['uri'] = uri
+            print(format_result(result), file=sys.stderr)
+        report['results'] += results
+    return report
+
+
+def format_result(result, baseline=None):
+    line = f"  {result['stage']:<12} {result['name'][:44]:<44} {result['seconds'] * 1000:9.1f} ms"
+    if result.get('warm_seconds') is not None:
+        line += f" (chaud {result['warm_seconds'] * 1000:7.1f} ms)"
+    if result.get('peak_bytes') is not None:
+        line += f"  pic {result['peak_bytes'] / 2 ** 20:7.1f} Mo"
+    if result.get('figure_bytes'):
+        line += f"  figures {result['figure_bytes'] / 1024:7.0f} Ko"
+    if result.get('map_bytes'):
+        line += f"  cartes {result['map_bytes'] / 1024:6.0f} Ko"
+    if 'modules' in result:
+        line += f"  chargés: {', '.join(result['modules']) or 'ni plotly ni folium'}"
+    if baseline:
+        line += f"  x{result['seconds'] / baseline['seconds']:.2f}" if baseline['seconds'] else ""
+    return line
+
+
+def compare(report, path):
+    """Affiche le rapport du temps de chaque mesure à celui d'un rapport précédent"""
+    with open(path, encoding='utf-8') as f:
+        previous = {(r['uri'], r['stage'], r['name']): r for r in json.load(f)['results']}
+    print(f"== Comparaison avec {path}", file=sys.stderr)
+    for result in report['results']:
+        baseline = previous.get((result['uri'], result['stage'], result['name']))
+        if baseline:
+            print(format_result(result, baseline), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai de la construction des données et du rendu des sections")
+    parser.add_argument('--uri', action='append',
+                        help="source à mesurer, même syntaxe que BAILLEURS_DATA_SOURCE (répétable)")
+    parser.add_argument('--seed', type=int, default=Dashboard.DATA_SEED, help="graine des données simulées")
+    parser.add_argument('--no-memory', action='store_true', help="ne mesure pas le pic mémoire (plus rapide)")
+    parser.add_argument('--output', default='benchmark.json', help="fichier de résultats JSON (défaut: %(default)s)")
+    parser.add_argument('--compare', help="rapport JSON précédent auquel comparer les temps")
+    args = parser.parse_args()
+
+    report = run(args.uri or DEFAULT_URIS, args.seed, not args.no_memory)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {args.output}", file=sys.stderr)
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
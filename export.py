@@ -0,0 +1,403 @@
+"""Export des rapports du dashboard en pages HTML statiques, sans serveur Streamlit
+
+Produit un rapport par bailleur (fiche bailleur et analyse du parc de ce bailleur)
+et un rapport par commune (demande de la commune, carte et avancement des projets
+situés dans la commune), avec les mêmes méthodes de rendu que le dashboard. Le jeu
+de données est construit une seule fois puis écrit en fichiers Arrow avec ses
+agrégats ; chaque processus du pool les projette en mémoire et garde ses caches
+de figures et de cartes d'un rapport à l'autre.
+
+    python export.py rapports/                                  # tous les rapports
+    python export.py rapports/ --source parquet:/data/bailleurs --workers 4
+    python export.py rapports/ --only bailleurs
+"""
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+
+import streamlit.config
+import streamlit.logger
+
+# Le dashboard est importé hors de `streamlit run` : les avertissements du mode
+# sans serveur n'ont pas d'intérêt ici (voir benchmark.py)
+streamlit.config.get_config_options()
+streamlit.logger.set_log_level('error')
+
+import numpy as np
+import pandas as pd
+import plotly.offline
+
+import Dashboard
+
+# Onglets rendus dans chaque type de rapport : (méthode de rendu, clé du sélecteur d'onglet, onglets)
+# None rend tous les onglets de la section
+REPORT_SECTIONS = {
+    'bailleur': [('create_bailleurs_analysis', 'tab_bailleurs', ['Fiche Bailleur']),
+                 ('create_parc_analysis', 'tab_parc', None)],
+    'commune': [('create_projets_analysis', 'tab_projets', ['Carte des Projets', 'Avancement'])]
+}
+
+
+def markdown_html(text):
+    """Conversion minimale du markdown utilisé par le dashboard (titres, gras, italique, séparateurs)"""
+    blocks = []
+    for line in html.escape(str(text)).split('\n'):
+        line = line.strip()
+        heading = re.match(r'(#{1,6}) (.*)', line)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif line == '---':
+            blocks.append('<hr>')
+        elif line:
+            line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', line)
+            line = re.sub(r'\*(.+?)\*', r'<em>\1</em>', line)
+            blocks.append(f"<p>{line}</p>")
+    return '\n'.join(blocks)
+
+
+class ReportColumn:
+    """Colonne d'un rapport : les éléments rendus dans son bloc `with` lui sont ajoutés"""
+
+    def __init__(self, report):
+        self.report = report
+        self.body = []
+
+    def __enter__(self):
+        self.previous = self.report.target
+        self.report.target = self.body
+        return self
+
+    def __exit__(self, *exc):
+        self.report.target = self.previous
+        return False
+
+
+class ReportStreamlit:
+    """Remplaçant du module streamlit : écrit les éléments rendus dans une page HTML
+
+    Les widgets renvoient leur valeur par défaut, sauf ceux dont la valeur est
+    imposée par clé ou par libellé (`choices`) ; les options proposées par chaque
+    sélecteur sont relevées dans `options`. La sidebar n'est pas écrite.
+    """
+
+    def __init__(self, choices=None, sidebar=True):
+        self.choices = choices if choices is not None else {}
+        self.options = {}
+        self.body = []
+        self.target = self.body
+        self.headers = set()
+        self.sidebar = ReportStreamlit(self.choices, sidebar=False) if sidebar else self
+
+    def __getattr__(self, name):
+        # set_page_config, rerun, expander... : aucun effet
+        return lambda *args, **kwargs: self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def emit(self, fragment):
+        self.target.append(fragment)
+        return self
+
+    # Éléments affichés
+
+    def markdown(self, body, unsafe_allow_html=False, **kwargs):
+        if not unsafe_allow_html:
+            return self.emit(markdown_html(body))
+        # Le titre d'une section rendue pour plusieurs onglets n'est écrit qu'une fois
+        if 'section-header' in body:
+            if body in self.headers:
+                return self
+            self.headers.add(body)
+        return self.emit(body)
+
+    def write(self, *args, **kwargs):
+        for arg in args:
+            self.emit(arg.to_html() if isinstance(arg, pd.DataFrame) else markdown_html(arg))
+        return self
+
+    def title(self, body, **kwargs):
+        return self.emit(f"<h1>{html.escape(str(body))}</h1>")
+
+    def subheader(self, body, **kwargs):
+        return self.emit(f"<h3>{html.escape(str(body))}</h3>")
+
+    def caption(self, body, **kwargs):
+        return self.emit(f"<p class='caption'>{html.escape(str(body))}</p>")
+
+    def metric(self, label, value, delta=None, **kwargs):
+        delta = f"<div class='delta'>{html.escape(str(delta))}</div>" if delta is not None else ''
+        return self.emit(f"<div class='metric'><div class='label'>{html.escape(str(label))}</div>"
+                         f"<div class='value'>{html.escape(str(value))}</div>{delta}</div>")
+
+    def json(self, body, **kwargs):
+        return self.emit(f"<pre>{html.escape(json.dumps(body, ensure_ascii=False, indent=2, default=str))}</pre>")
+
+    def progress(self, value, **kwargs):
+        return self.emit(f"<progress value='{value}' max='{1 if isinstance(value, float) else 100}'></progress>")
+
+    def dataframe(self, data, hide_index=None, **kwargs):
+        return self.emit(pd.DataFrame(data).to_html(index=not hide_index))
+
+    def plotly_chart(self, fig, **kwargs):
+        return self.emit(fig.to_html(full_html=False, include_plotlyjs=False, default_width='100%',
+                                       default_height='450px'))
+
+    def iframe(self, src, width=None, height=None, **kwargs):
+        return self.emit(f"<iframe srcdoc=\"{html.escape(src)}\" width='100%' height='{height or 500}'></iframe>")
+
+    def html(self, page, height=None, width=None, **kwargs):
+        return self.iframe(page, width=width, height=height)
+
+    # Mise en page
+
+    def columns(self, spec, **kwargs):
+        columns = [ReportColumn(self) for _ in range(spec if isinstance(spec, int) else len(spec))]
+        self.emit(columns)
+        return columns
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    # Widgets
+
+    def radio(self, label, options, key=None, **kwargs):
+        return self.choose(key or label, list(options), kwargs.get('index', 0))
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return self.choose(key or label, list(options), index)
+
+    def choose(self, key, options, index):
+        self.options[key] = options
+        choice = self.choices.get(key)
+        return choice if choice in options else (options[index] if options else None)
+
+    def multiselect(self, label, options, default=None, **kwargs):
+        return list(default or [])
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, **kwargs):
+        return value
+
+    def date_input(self, label, value=None, **kwargs):
+        return value.date() if isinstance(value, datetime) else value
+
+    def button(self, *args, **kwargs):
+        return False
+
+    def fragment(self, *args, **kwargs):
+        return lambda function: function
+
+    def render(self, title):
+        """Page HTML complète du rapport"""
+        def layout(fragments):
+            parts = []
+            for fragment in fragments:
+                if isinstance(fragment, list):
+                    parts.append("<div class='columns'>" + ''.join(
+                        f"<div class='column'>{layout(column.body)}</div>" for column in fragment) + "</div>")
+                else:
+                    parts.append(fragment)
+            return '\n'.join(parts)
+
+        return (
+            "<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'>"
+            f"<title>{html.escape(title)}</title><script src='plotly.min.js'></script>"
+            f"{Dashboard.DASHBOARD_CSS}{REPORT_CSS}</head><body>{layout(self.body)}</body></html>"
+        )
+
+
+REPORT_CSS = """
+<style>
+    body { font-family: sans-serif; margin: 2rem; }
+    .columns { display: flex; gap: 1.5rem; }
+    .column { flex: 1; min-width: 0; }
+    .metric { margin: 0.5rem 0; }
+    .metric .label { font-size: 0.85rem; color: #555; }
+    .metric .value { font-size: 1.5rem; }
+    .caption { font-size: 0.85rem; color: #777; }
+    iframe { border: none; }
+</style>
+"""
+
+
+# État de chaque processus du pool : dashboard construit sur le jeu de données partagé
+# et contrôles communs à tous les rapports
+_dashboard = None
+_controls = None
+
+
+def report_controls(dataset, debut=None, fin=None):
+    """Contrôles des rapports : tous les types de logement, période explicite
+    
+    Les valeurs par défaut de la sidebar (trois types de logement, trois dernières
+    années) ne s'appliquent pas : la période va par défaut du début de l'historique
+    à la date des données.
+    """
+    return {
+        'date_debut': debut or dataset['historical_data']['date'].min().date(),
+        'date_fin': fin or dataset['built_at'].date(),
+        'bailleurs_selectionnes': [],
+        'types_logement': [],
+        'show_details': False,
+        'auto_refresh': False
+    }
+
+
+def init_worker(directory, debut=None, fin=None):
+    """Projette en mémoire le jeu de données et les agrégats écrits par le processus principal"""
+    global _dashboard, _controls
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+    cube = manifest.get('aggregates')
+    if cube is not None:
+        cube = Dashboard.AggregateCube.read(os.path.join(directory, manifest['version']), cube)
+    Dashboard.st = ReportStreamlit()
+    _dashboard = Dashboard.BailleursSociauxDashboard(dataset=Dashboard.attach_dataset(directory), cube=cube)
+    _controls = report_controls(_dashboard.dataset, debut, fin)
+
+
+def report_filename(kind, name):
+    """Nom de fichier d'un rapport, lisible et sans caractère problématique"""
+    # Lettres accentuées décomposées puis ramenées à leur lettre de base (î → i)
+    ascii_name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode()
+    slug = re.sub(r'[^0-9A-Za-z]+', '-', ascii_name).strip('-').lower()
+    return f"{kind}-{slug or Dashboard.stable_digest(name)}.html"
+
+
+def render_sections(dashboard, report, kind):
+    """Rendu des onglets des sections d'un type de rapport"""
+    for method, key, tabs in REPORT_SECTIONS[kind]:
+        if tabs is None:
+            # Premier onglet, qui relève la liste des onglets, puis les suivants
+            report.choices.pop(key, None)
+            getattr(dashboard, method)()
+            tabs = report.options[key][1:]
+        for tab in tabs:
+            report.choices[key] = tab
+            getattr(dashboard, method)()
+
+
+def render_report(task):
+    """Écrit le rapport d'un bailleur ou d'une commune ; retourne son fichier, sa durée et sa taille"""
+    kind, name, output = task
+    start = time.perf_counter()
+    dashboard = _dashboard
+    report = ReportStreamlit()
+    Dashboard.st = report
+    controls = dict(_controls)
+    periode = f"{controls['date_debut']:%d/%m/%Y} – {controls['date_fin']:%d/%m/%Y}"
+
+    if kind == 'bailleur':
+        controls['bailleurs_selectionnes'] = [name]
+        dashboard.view = dashboard.filter_engine.apply(controls)
+        report.choices['Sélectionnez un bailleur:'] = name
+        title = f"Rapport bailleur — {name}"
+    else:
+        controls['bailleurs_selectionnes'] = list(dashboard.filter_engine.bailleurs)
+        view = dashboard.filter_engine.apply(controls)
+        # Projets de la vue situés dans la commune : vue dérivée, mise en cache sous sa propre clé
+        spatial = view.spatial()
+        rows = np.asarray(spatial.communes() == name)
+        projets = view.projets[rows]
+        indices = {('projets', 'coords'): Dashboard.SpatialIndex(projets, parent=spatial, rows=rows)}
+        dashboard.view = view._replace(key=view.key + (('commune', name),), projets=projets, indices=indices)
+        title = f"Rapport commune — {name}"
+
+    report.markdown(f'<h1 class="main-header">{html.escape(title)}</h1>', unsafe_allow_html=True)
+    report.caption(f"Période: {periode} • Données du {dashboard.dataset['built_at']:%d/%m/%Y %H:%M} "
+                   f"• Version {dashboard.dataset['version']}")
+    if kind == 'commune':
+        demande = dashboard.demande_data[dashboard.demande_data['commune'] == name]
+        report.subheader("Demande de logement social")
+        for column, value in demande.drop(columns='commune').iloc[0].items() if len(demande) else ():
+            report.metric(column.replace('_', ' ').capitalize(),
+                          f"{value:,.0f}" if float(value).is_integer() else f"{value:,.1f}")
+        report.caption(f"{len(projets)} projets dans la commune")
+    render_sections(dashboard, report, kind)
+
+    page = report.render(title)
+    path = os.path.join(output, report_filename(kind, name))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(page)
+    return path, time.perf_counter() - start, len(page)
+
+
+def write_index(output, results, dataset):
+    """Page d'accueil listant les rapports produits"""
+    links = ''.join(f"<li><a href='{html.escape(os.path.basename(path))}'>{html.escape(title)}</a></li>"
+                    for title, path in results)
+    with open(os.path.join(output, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(f"<!DOCTYPE html><html lang='fr'><head><meta charset='utf-8'><title>Rapports</title></head><body>"
+                f"<h1>Rapports bailleurs sociaux</h1><p>Données du {dataset['built_at']:%d/%m/%Y %H:%M}, "
+                f"version {html.escape(dataset['version'])}</p><ul>{links}</ul></body></html>")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporte un rapport HTML par bailleur et par commune")
+    parser.add_argument('output', help="répertoire des rapports")
+    parser.add_argument('--source', default=Dashboard.DATA_SOURCE_URI,
+                        help="source des données, même syntaxe que BAILLEURS_DATA_SOURCE (défaut: %(default)s)")
+    parser.add_argument('--seed', type=int, default=Dashboard.DATA_SEED, help="graine des données simulées")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="processus de rendu (défaut: %(default)s)")
+    parser.add_argument('--only', choices=['bailleurs', 'communes'], help="ne produit qu'un type de rapport")
+    parser.add_argument('--debut', type=date.fromisoformat,
+                        help="début de la période des rapports, AAAA-MM-JJ (défaut: début de l'historique)")
+    parser.add_argument('--fin', type=date.fromisoformat,
+                        help="fin de la période des rapports, AAAA-MM-JJ (défaut: date des données)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    os.makedirs(args.output, exist_ok=True)
+    with open(os.path.join(args.output, 'plotly.min.js'), 'w', encoding='utf-8') as f:
+        f.write(plotly.offline.get_plotlyjs())
+
+    with tempfile.TemporaryDirectory(prefix='bailleurs-export-') as scratch:
+        # Jeu de données et agrégats construits une fois, projetés en mémoire par chaque processus
+        if args.source.startswith('shared:'):
+            directory = args.source.partition(':')[2]
+            dataset = Dashboard.attach_dataset(directory)
+        else:
+            directory = scratch
+            dataset = Dashboard.read_dataset(args.source, args.seed)
+            Dashboard.materialize_dataset(dataset, directory, keep=1, cube=Dashboard.AggregateCube(dataset))
+
+        tasks = []
+        if args.only != 'communes':
+            tasks += [('bailleur', b['nom'], args.output) for b in dataset['bailleurs_data']]
+        if args.only != 'bailleurs':
+            tasks += [('commune', commune, args.output) for commune in dataset['demande_data']['commune']]
+
+        # Lots contigus : un processus enchaîne des rapports qui partagent ses caches
+        workers = max(1, min(args.workers, len(tasks)))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        if workers == 1:
+            init_worker(directory, args.debut, args.fin)
+            results = list(map(render_report, tasks))
+        else:
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(directory, args.debut, args.fin)) as executor:
+                results = list(executor.map(render_report, tasks, chunksize=chunksize))
+
+    for (kind, name, _), (path, seconds, size) in zip(tasks, results):
+        print(f"  {kind:<9} {name[:48]:<48} {seconds * 1000:8.0f} ms {size / 1024:8.0f} Ko", file=sys.stderr)
+    write_index(args.output, [(f"{kind.capitalize()} — {name}", path) for (kind, name, _), (path, _, _)
+                              in zip(tasks, results)], dataset)
+    print(f"{len(results)} rapports écrits dans {args.output} en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
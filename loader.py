@@ -0,0 +1,36 @@
+"""Chargeur du mode multi-workers
+
+Construit une fois le jeu de données du dashboard et l'écrit en fichiers Arrow IPC
+dans un répertoire partagé (idéalement en mémoire, par exemple /dev/shm). Chaque
+worker Streamlit lancé avec BAILLEURS_DATA_SOURCE=shared:<répertoire> projette
+alors ces fichiers en mémoire au lieu de reconstruire ses propres DataFrames :
+
+    python loader.py /dev/shm/bailleurs --source parquet:/data/bailleurs
+    BAILLEURS_DATA_SOURCE=shared:/dev/shm/bailleurs streamlit run Dashboard.py --server.port 8501
+    BAILLEURS_DATA_SOURCE=shared:/dev/shm/bailleurs streamlit run Dashboard.py --server.port 8502
+"""
+import argparse
+import time
+
+from Dashboard import DATA_SEED, DATA_SOURCE_URI, materialize_dataset, read_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Écrit le jeu de données du dashboard pour les workers")
+    parser.add_argument('directory', help="répertoire partagé par les workers (ex. /dev/shm/bailleurs)")
+    parser.add_argument('--source', default=DATA_SOURCE_URI,
+                        help="source des données, même syntaxe que BAILLEURS_DATA_SOURCE (défaut: %(default)s)")
+    parser.add_argument('--seed', type=int, default=DATA_SEED, help="graine des données simulées")
+    args = parser.parse_args()
+
+    if args.source.startswith('shared:'):
+        parser.error("la source du chargeur ne peut pas être elle-même un répertoire partagé")
+
+    start = time.perf_counter()
+    dataset = read_dataset(args.source, args.seed)
+    target = materialize_dataset(dataset, args.directory)
+    print(f"Version {dataset['version']} écrite dans {target} en {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == '__main__':
+    main()
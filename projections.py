@@ -0,0 +1,89 @@
+"""Simulation Monte Carlo des bailleurs sociaux à l'horizon 2025-2040
+
+Noyau de calcul des projections du dashboard, sans dépendance à Streamlit : il est
+importé par les processus du pool qui simulent les lots de scénarios en parallèle
+(voir ProjectionEngine dans Dashboard.py). Chaque lot est tiré d'un générateur
+dérivé de la graine et du numéro du lot, si bien qu'un même lot donne le même
+résultat quel que soit le processus qui le calcule.
+
+Les trajectoires d'un lot sont des tableaux (scénarios × bailleurs × années) :
+- construction : marche aléatoire log-normale autour du rythme actuel, avec un choc
+  annuel commun à tous les bailleurs du scénario (conjoncture, financements) et un
+  choc propre à chaque bailleur ;
+- parc : parc précédent diminué des sorties (démolitions, ventes), plus la construction ;
+- impayés : processus de retour vers le taux actuel du bailleur, avec un choc commun
+  et un choc propre, borné à zéro ;
+- investissement : construction multipliée par le coût actuel d'un logement, revalorisé
+  chaque année d'une inflation des coûts commune au scénario.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+# Indicateurs simulés, dans l'ordre des tableaux de centiles
+INDICATEURS = ('parc', 'construction', 'impayes', 'investissement')
+
+Hypotheses = namedtuple('Hypotheses', [
+    'derive_construction', 'choc_construction', 'volatilite_construction', 'taux_sortie',
+    'inflation_couts', 'volatilite_couts', 'retour_impayes', 'choc_impayes', 'volatilite_impayes'
+])
+
+
+def simulate(base, hypotheses, annees, rng, taille):
+    """Trajectoires de `taille` scénarios ; retourne un tableau (indicateur, scénario, bailleur, année)
+
+    `base` contient, par bailleur, le parc, la construction annuelle, le taux
+    d'impayés (%) et l'investissement annuel (M€) de la dernière année connue.
+    """
+    h = hypotheses
+    parc0, construction0, impayes0, investissement0 = (np.asarray(base[name], dtype='float64') for name in INDICATEURS)
+    n_bailleurs = len(parc0)
+    shape = (taille, n_bailleurs, annees)
+
+    # Construction : dérive corrigée pour que la médiane suive la dérive annuelle
+    variance = h.choc_construction ** 2 + h.volatilite_construction ** 2
+    chocs = (h.choc_construction * rng.standard_normal((taille, 1, annees))
+             + h.volatilite_construction * rng.standard_normal(shape))
+    construction = construction0[:, None] * np.exp(np.cumsum(h.derive_construction - variance / 2 + chocs, axis=2))
+
+    # Coût d'un logement (M€), revalorisé par une inflation commune au scénario
+    cout0 = np.divide(investissement0, construction0, out=np.zeros(n_bailleurs), where=construction0 > 0)
+    inflation = np.cumsum(h.inflation_couts + h.volatilite_couts * rng.standard_normal((taille, 1, annees)), axis=2)
+    investissement = construction * cout0[:, None] * np.exp(inflation)
+
+    # Parc et impayés : récurrences annuelles, vectorisées sur les scénarios et les bailleurs
+    parc = np.empty(shape)
+    impayes = np.empty(shape)
+    chocs = (h.choc_impayes * rng.standard_normal((taille, 1, annees))
+             + h.volatilite_impayes * rng.standard_normal(shape))
+    stock = np.broadcast_to(parc0, (taille, n_bailleurs))
+    taux = np.broadcast_to(impayes0, (taille, n_bailleurs))
+    for annee in range(annees):
+        stock = stock * (1 - h.taux_sortie) + construction[:, :, annee]
+        taux = np.maximum(taux + h.retour_impayes * (impayes0 - taux) + chocs[:, :, annee], 0)
+        parc[:, :, annee] = stock
+        impayes[:, :, annee] = taux
+
+    return np.stack([parc, construction, impayes, investissement])
+
+
+def simulate_batch(base, hypotheses, annees, seed, lot, taille, centiles):
+    """Simule un lot de scénarios ; retourne les centiles par bailleur et pour l'ensemble du parc
+
+    Le résultat a la forme (indicateur, centile, bailleur, année), la dernière ligne
+    des bailleurs étant l'ensemble : sommes des bailleurs, impayés pondérés par le parc.
+    """
+    trajectoires = simulate(base, hypotheses, annees, np.random.default_rng([seed, lot]), taille)
+    parc = trajectoires[0]
+    ensemble = trajectoires.sum(axis=2, keepdims=True)
+    ensemble[2] = (trajectoires[2] * parc).sum(axis=1, keepdims=True) / parc.sum(axis=1, keepdims=True)
+    trajectoires = np.concatenate([trajectoires, ensemble], axis=2)
+
+    # Centiles par interpolation linéaire entre scénarios triés (comme np.percentile) :
+    # un tri suivi d'une lecture est bien plus rapide qu'une sélection par centile
+    ordre = np.sort(trajectoires, axis=1)
+    rang = np.asarray(centiles, dtype='float64') / 100 * (taille - 1)
+    bas = np.floor(rang).astype('int64')
+    haut = np.minimum(bas + 1, taille - 1)
+    poids = (rang - bas)[:, None, None]
+    return ordre[:, bas] * (1 - poids) + ordre[:, haut] * poids
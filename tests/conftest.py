@@ -0,0 +1,30 @@
+"""Configuration commune des tests : le dashboard est importé hors de `streamlit run`"""
+import os
+import sys
+
+import pytest
+import streamlit.config
+import streamlit.logger
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Avertissements du mode sans serveur sans intérêt ici (voir benchmark.py)
+streamlit.config.get_config_options()
+streamlit.logger.set_log_level('error')
+
+
+def pytest_addoption(parser):
+    parser.addoption('--slow', action='store_true', help="exécute aussi les tests marqués slow (grands volumes)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: test sur un grand volume, exécuté seulement avec --slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--slow'):
+        return
+    skip = pytest.mark.skip(reason="grand volume : relancer avec --slow")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,51 @@
+"""Moteur d'adéquation offre/demande"""
+import numpy as np
+import pytest
+
+import Dashboard
+
+
+@pytest.fixture(scope='module', params=[
+    'synthetic',
+    'synthetic?bailleurs=50&projets=2000&communes=10&annees=5',
+    'synthetic?bailleurs=200&projets=5000&communes=24&annees=5'
+])
+def snapshot(request):
+    return Dashboard.DataStore(Dashboard.read_dataset(request.param, Dashboard.DATA_SEED)).snapshot
+
+
+def test_matcher(snapshot):
+    communes = snapshot.filter_engine.base_indices[('projets', 'coords')].communes()
+    matcher = snapshot.cube.matcher(snapshot.dataset, communes)
+    parc = snapshot.dataset['parc_data']
+    # Tout le parc est réparti entre les communes, toute la demande entre les types
+    assert matcher.offre.sum() == pytest.approx(parc['nombre_logements'].sum())
+    assert matcher.demande.sum() == pytest.approx(snapshot.dataset['demande_data']['demande_totale'].sum())
+    results = matcher.run()
+    assert results['deficit'].shape == (len(Dashboard.SCENARIOS_ADEQUATION), *matcher.offre.shape)
+    assert (results['deficit'] >= 0).all() and not np.isnan(results['couverture']).any()
+    frame = matcher.frame('Tendanciel')
+    assert len(frame) == len(matcher.communes) * len(matcher.types)
+
+
+def test_onglet_sans_demande():
+    # Toute la demande à zéro : les moyennes pondérées s'affichent « — » au lieu d'échouer
+    from streamlit.testing.v1 import AppTest
+
+    dataset = dict(Dashboard.read_dataset('synthetic', Dashboard.DATA_SEED))
+    dataset['demande_data'] = dataset['demande_data'].assign(demande_totale=0, demande_urgence=0)
+
+    def script(dataset):
+        import streamlit as st
+
+        import Dashboard
+        dashboard = Dashboard.BailleursSociauxDashboard(dataset=dataset)
+        dashboard.view = dashboard.filter_engine.apply()
+        st.session_state['tab_demande'] = "Adéquation Offre-Demande"
+        dashboard.create_demande_analysis()
+
+    at = AppTest.from_function(script, args=(dataset,), default_timeout=60)
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    metrics = {metric.label: metric.value for metric in at.metric}
+    assert all(metrics[label] == "—" for label in ("Taux de couverture", "Couverture à un an", "Attente moyenne"))
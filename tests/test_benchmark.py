@@ -0,0 +1,20 @@
+"""Rendu sans serveur de toutes les sections, aux tailles mesurées par benchmark.py"""
+import pytest
+
+import benchmark
+import Dashboard
+
+
+# La volumétrie cible (1M de projets) ajoute une quinzaine de secondes : seulement avec --slow
+@pytest.mark.parametrize('uri', [
+    pytest.param(uri, marks=pytest.mark.slow) if 'projets=1000000' in uri else uri
+    for uri in benchmark.DEFAULT_URIS
+])
+def test_bench_sections(uri, monkeypatch):
+    # bench_sections remplace `st` et `components` du dashboard : restaurés après le test
+    monkeypatch.setattr(Dashboard, 'st', Dashboard.st)
+    monkeypatch.setattr(Dashboard, 'components', Dashboard.components)
+    results = benchmark.bench_sections(Dashboard.read_dataset(uri, Dashboard.DATA_SEED), memory=False)
+    sections = {result['name'].split(' / ')[0] for result in results}
+    assert set(Dashboard.SECTIONS) <= sections
+    assert all(result['seconds'] >= 0 for result in results)
@@ -0,0 +1,25 @@
+"""Téléchargement des tables filtrées"""
+import io
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import Dashboard
+
+
+@pytest.fixture(scope='module')
+def view():
+    dataset = Dashboard.read_dataset('synthetic', Dashboard.DATA_SEED)
+    return Dashboard.FilterEngine(dataset).apply()
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet'])
+def test_export_frame_accepte_par_streamlit(view, fmt):
+    data, _ = convert_data_to_bytes_and_infer_mime(Dashboard.export_frame(view.projets, fmt), ValueError(fmt))
+    if fmt == 'csv':
+        rows = len(pd.read_csv(io.BytesIO(data)))
+    else:
+        rows = pq.read_table(io.BytesIO(data)).num_rows
+    assert rows == len(view.projets)
@@ -0,0 +1,7 @@
+"""Export des rapports HTML"""
+import export
+
+
+def test_report_filename_translittere():
+    assert export.report_filename('commune', 'Saint-Benoît') == 'commune-saint-benoit.html'
+    assert export.report_filename('commune', "L'Étang-Salé") == 'commune-l-etang-sale.html'
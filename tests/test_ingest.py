@@ -0,0 +1,36 @@
+"""Ingestion incrémentale : ajouts et mises à jour par clé"""
+import pandas as pd
+import pytest
+
+import Dashboard
+
+
+@pytest.fixture(scope='module')
+def dataset():
+    return Dashboard.read_dataset('synthetic', Dashboard.DATA_SEED)
+
+
+def test_key_positions_sans_candidat():
+    frame = pd.DataFrame({'nom': ['a', 'b', 'c']})
+    rows = pd.DataFrame({'nom': ['x', 'y']})
+    assert Dashboard.key_positions(frame, rows, ('nom',)).tolist() == [-1, -1]
+
+
+def test_key_positions_mixte():
+    frame = pd.DataFrame({'nom': ['a', 'b', 'c']})
+    rows = pd.DataFrame({'nom': ['c', 'x', 'a']})
+    assert Dashboard.key_positions(frame, rows, ('nom',)).tolist() == [2, -1, 0]
+
+
+def test_upsert_nouveau_projet(dataset):
+    store = Dashboard.DataStore(dataset)
+    projet = dataset['projets_data'].iloc[:1].assign(nom_projet='Projet nouveau')
+    snapshot = store.ingest(upserts={'projets': projet})
+    assert len(snapshot.dataset['projets_data']) == len(dataset['projets_data']) + 1
+
+
+def test_upsert_nouvelle_commune(dataset):
+    store = Dashboard.DataStore(dataset)
+    demande = dataset['demande_data'].iloc[:1].assign(commune='Zone nouvelle')
+    snapshot = store.ingest(upserts={'demande': demande})
+    assert snapshot.dataset['demande_data']['commune'].astype(str).iloc[-1] == 'Zone nouvelle'